@@ -0,0 +1,35 @@
+"""
+Benchmarks for django-json-field.
+
+Each module can be run from the repository root, e.g.:
+
+    python -m benchmarks.decoder
+
+benchmarks.suite runs the broader set of encoding, decoding, ORM and form
+benchmarks and can save its results as JSON to compare runs.
+"""
+from __future__ import print_function
+
+import os
+import timeit
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_project.settings')
+    import django
+    if hasattr(django, 'setup'): # django >= 1.7
+        django.setup()
+
+def setup_database():
+    """ Creates a throwaway test database for the default connection. """
+    from django.db import connection
+    connection.creation.create_test_db(verbosity=0)
+
+def measure(func, number=1, repeat=5):
+    """ Returns the best time in seconds of a single call to func. """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def report(name, seconds, baseline=None):
+    line = '%-40s %10.3f ms' % (name, seconds * 1000)
+    if baseline:
+        line += '  (%.2fx)' % (baseline / seconds)
+    print(line)
@@ -0,0 +1,52 @@
+"""
+Compares importing rows with bulk_create() and with
+JSONQuerySet.bulk_create_json(), serially and with thread and process
+pools. The number of rows defaults to 100000 and can be set with the ROWS
+environment variable.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, setup_database, measure
+setup()
+setup_database()
+
+import datetime
+import os
+from decimal import Decimal
+
+from test_project.app.models import Test
+
+ROWS = int(os.environ.get('ROWS', 100000))
+
+def make_objs():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    return [Test(json={'id': i, 'created': now, 'amount': Decimal('%d.25' % i),
+                       'lines': [{'sku': 'sku-%d' % j, 'qty': j} for j in range(10)]},
+                 json_eager=None) for i in range(ROWS)]
+
+def report(name, seconds):
+    print('%-40s %10.3f s %10d rows/s' % (name, seconds, ROWS / seconds))
+
+def run(name, func):
+    objs = make_objs()
+    def import_rows():
+        func(objs)
+        Test.objects.all().delete()
+    report(name, measure(import_rows, repeat=1))
+
+def main():
+    run('bulk_create()', lambda objs: Test.objects.bulk_create(objs))
+    run('bulk_create_json()', lambda objs: Test.objects.bulk_create_json(objs))
+    try:
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    except ImportError:
+        return
+    for name, executor in (('threads', ThreadPoolExecutor(4)), ('processes', ProcessPoolExecutor(4))):
+        try:
+            run('bulk_create_json(executor=4 %s)' % name,
+                lambda objs: Test.objects.bulk_create_json(objs, executor=executor, chunk_size=500))
+        finally:
+            executor.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Compares the throughput of deserializing JSON fields one instance at a
+time with JSONQuerySet.decode_json().
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, setup_database, measure
+setup()
+setup_database()
+
+import datetime
+
+from test_project.app.models import Test
+
+ROWS = 2000
+
+def populate():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    document = {'items': [{'id': i, 'name': 'item %d' % i, 'created': now, 'price': 1.5 * i}
+                          for i in range(50)]}
+    Test.objects.bulk_create([Test(json=document, json_eager=None) for i in range(ROWS)])
+
+def report(name, seconds):
+    print('%-40s %10.3f ms %10d rows/s' % (name, seconds * 1000, ROWS / seconds))
+
+def main():
+    populate()
+    report('attribute access', measure(lambda: [obj.json for obj in Test.objects.iterator()], repeat=3))
+    for batch_size in (100, 1000):
+        report('decode_json(batch_size=%d)' % batch_size, measure(
+            lambda: list(Test.objects.decode_json('json', batch_size=batch_size)), repeat=3))
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+    except ImportError:
+        return
+    executor = ProcessPoolExecutor(4)
+    try:
+        report('decode_json(executor=4 processes)', measure(
+            lambda: list(Test.objects.decode_json('json', batch_size=500, executor=executor)), repeat=3))
+    finally:
+        executor.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Compares building an encoder and decoder on every call, as json.dumps() and
+json.loads() do when passed a cls, with the instances JSONField keeps.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure, report
+setup()
+
+import json
+from decimal import Decimal
+
+from json_field.fields import JSONEncoder, JSONDecoder, JSONField
+
+def main():
+    field = JSONField()
+    encode, decode = field.get_codec()
+    values = [{'id': i, 'name': 'item %d' % i, 'tags': ['a', 'b']} for i in range(10000)]
+    texts = [json.dumps(value, cls=JSONEncoder) for value in values]
+
+    print('encode (%d small documents)' % len(values))
+    baseline = measure(lambda: [json.dumps(value, cls=JSONEncoder) for value in values])
+    report('  json.dumps(cls=JSONEncoder)', baseline)
+    report('  cached encoder', measure(lambda: [encode(value) for value in values]), baseline)
+
+    print('decode (%d small documents)' % len(texts))
+    baseline = measure(lambda: [json.loads(text, cls=JSONDecoder, parse_float=Decimal) for text in texts])
+    report('  json.loads(cls=JSONDecoder)', baseline)
+    report('  cached decoder', measure(lambda: [decode(text) for text in texts]), baseline)
+
+if __name__ == '__main__':
+    main()
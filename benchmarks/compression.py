@@ -0,0 +1,49 @@
+"""
+Reports the stored size and the encode/decode latency of each compression
+codec, including JSON serialization.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure
+setup()
+
+import json
+import datetime
+from decimal import Decimal
+from importlib import import_module
+
+from json_field import compression
+from json_field.fields import JSONEncoder, JSONDecoder
+
+def documents():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    yield 'small', {'id': 1, 'name': 'test', 'enabled': True}
+    yield 'records', [{'id': i, 'name': 'user %d' % i, 'email': 'user%d@example.com' % i,
+                       'created': now, 'balance': Decimal('%d.25' % i)} for i in range(2000)]
+    yield 'numbers', [i * 7919 % 104729 for i in range(20000)]
+
+def main():
+    codecs = [None]
+    for name, cls in sorted(compression.CODECS.items()):
+        try:
+            import_module(cls.module_name)
+        except ImportError:
+            print('%s: %s is not installed' % (name, cls.module_name))
+        else:
+            codecs.append(name)
+    print('%-10s %-6s %12s %12s %12s' % ('document', 'codec', 'bytes', 'encode ms', 'decode ms'))
+    for doc_name, doc in documents():
+        for codec in codecs:
+            def encode():
+                data = json.dumps(doc, cls=JSONEncoder).encode('utf-8')
+                return compression.compress(data, codec) if codec else data
+            stored = encode()
+
+            def decode():
+                return json.loads(compression.decompress(stored).decode('utf-8'),
+                                  cls=JSONDecoder, parse_float=Decimal)
+            print('%-10s %-6s %12d %12.3f %12.3f' % (
+                doc_name, codec or 'none', len(stored), measure(encode) * 1000, measure(decode) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares the single pass JSONDecoder with the previous decoder, which
+re-walked the parsed document and ran every string through three regular
+expressions, and with a SchemaDecoder converting only the declared paths.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure, report
+setup()
+
+import json
+import datetime
+from decimal import Decimal
+
+import six
+from dateutil import parser as date_parser
+
+from json_field.fields import JSONEncoder, JSONDecoder, SchemaDecoder, TIME_RE, DATE_RE, DATETIME_RE
+
+class LegacyJSONDecoder(json.JSONDecoder):
+    """ The recursive decoder shipped up to 0.5.7. """
+
+    _recursable_types = ([str] if six.PY3 else [str, unicode]) + [list, dict]
+
+    def _is_recursive(self, obj):
+        return type(obj) in LegacyJSONDecoder._recursable_types
+
+    def decode(self, obj, *args, **kwargs):
+        if not kwargs.get('recurse', False):
+            obj = super(LegacyJSONDecoder, self).decode(obj, *args, **kwargs)
+        if isinstance(obj, list):
+            for i in six.moves.xrange(len(obj)):
+                item = obj[i]
+                if self._is_recursive(item):
+                    obj[i] = self.decode(item, recurse=True)
+        elif isinstance(obj, dict):
+            for key, value in obj.items():
+                if self._is_recursive(value):
+                    obj[key] = self.decode(value, recurse=True)
+        elif isinstance(obj, six.string_types):
+            if TIME_RE.match(obj):
+                try:
+                    return date_parser.parse(obj).time()
+                except ValueError:
+                    pass
+            if DATE_RE.match(obj):
+                try:
+                    return date_parser.parse(obj).date()
+                except ValueError:
+                    pass
+            if DATETIME_RE.match(obj):
+                try:
+                    return date_parser.parse(obj)
+                except ValueError:
+                    pass
+        return obj
+
+def documents():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    yield 'strings', [{'name': 'user %d' % i, 'email': 'user%d@example.com' % i,
+                       'tags': ['a', 'b', 'c']} for i in range(5000)]
+    yield 'dates', [{'created': now, 'day': now.date(), 'at': now.time(),
+                     'name': 'event %d' % i} for i in range(5000)]
+    yield 'numbers', [{'id': i, 'price': Decimal('%d.99' % i), 'qty': i * 3}
+                      for i in range(5000)]
+
+# the date fields of the 'dates' documents
+SCHEMA = {'*.created': datetime.datetime, '*.day': datetime.date, '*.at': datetime.time}
+
+def main():
+    for name, doc in documents():
+        text = json.dumps(doc, cls=JSONEncoder)
+        legacy = json.loads(text, cls=LegacyJSONDecoder, parse_float=Decimal)
+        assert legacy == json.loads(text, cls=JSONDecoder, parse_float=Decimal)
+        print('%s (%d KB)' % (name, len(text) // 1024))
+        baseline = measure(lambda: json.loads(text, cls=LegacyJSONDecoder, parse_float=Decimal))
+        report('  legacy decoder', baseline)
+        report('  single pass decoder', measure(
+            lambda: json.loads(text, cls=JSONDecoder, parse_float=Decimal)), baseline)
+        report('  schema decoder', measure(
+            lambda: json.loads(text, cls=SchemaDecoder, schema=SCHEMA, parse_float=Decimal)), baseline)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares JSONEncoder, which looks up the encoding of dates, times and
+decimals by type, with the previous chain of isinstance() checks. Output
+must be identical.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure, report
+setup()
+
+import json
+import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from json_field.fields import JSONEncoder
+from json_field.utils import is_aware
+
+class LegacyJSONEncoder(json.JSONEncoder):
+    """ The encoder shipped up to 0.5.7. """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            r = o.isoformat()
+            if o.microsecond:
+                r = r[:23] + r[26:]
+            if r.endswith('+00:00'):
+                r = r[:-6] + 'Z'
+            return r
+        elif isinstance(o, datetime.date):
+            return o.isoformat()
+        elif isinstance(o, datetime.time):
+            if is_aware(o):
+                raise ValueError("JSON can't represent timezone-aware times.")
+            r = o.isoformat()
+            if o.microsecond:
+                r = r[:12]
+            return r
+        elif isinstance(o, Decimal):
+            return str(o)
+        else:
+            return super(LegacyJSONEncoder, self).default(o)
+
+def documents():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123456)
+    yield 'timestamps', [{'created': now + datetime.timedelta(seconds=i, microseconds=i),
+                          'day': (now + datetime.timedelta(days=i)).date(),
+                          'at': (now + datetime.timedelta(seconds=i)).time()} for i in range(5000)]
+    yield 'aware timestamps', [{'created': timezone.make_aware(now + datetime.timedelta(seconds=i), timezone.utc),
+                                'name': 'event %d' % i} for i in range(5000)]
+    yield 'decimals', [{'amount': Decimal('%d.%02d' % (i, i % 100)), 'fee': Decimal('0.35'),
+                        'rate': Decimal('1.0825'), 'account': i} for i in range(5000)]
+
+def main():
+    legacy, current = LegacyJSONEncoder(), JSONEncoder()
+    for name, doc in documents():
+        text = legacy.encode(doc)
+        assert text == current.encode(doc)
+        print('%s (%d KB)' % (name, len(text) // 1024))
+        baseline = measure(lambda: legacy.encode(doc), repeat=15)
+        report('  legacy encoder', baseline)
+        report('  JSONEncoder', measure(lambda: current.encode(doc), repeat=15), baseline)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Reports the stored size and the encode/decode latency of JSON text and of
+each binary format, through the same code paths as JSONField.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure
+setup()
+
+import datetime
+from decimal import Decimal
+from importlib import import_module
+
+from json_field import JSONField, formats
+
+def documents():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    yield 'small', {'id': 1, 'name': 'test', 'enabled': True}
+    yield 'records', [{'id': i, 'name': 'user %d' % i, 'email': 'user%d@example.com' % i,
+                       'created': now, 'day': now.date(), 'balance': Decimal('%d.25' % i)} for i in range(2000)]
+    yield 'strings', ['text %d' % i for i in range(20000)]
+    yield 'numbers', [i * 7919 % 104729 for i in range(20000)]
+
+def main():
+    fields = [('json', JSONField())]
+    for name, cls in sorted(formats.FORMATS.items()):
+        try:
+            import_module(cls.module_name)
+        except ImportError:
+            print('%s: %s is not installed' % (name, cls.module_name))
+        else:
+            fields.append((name, JSONField(format=name)))
+    print('%-10s %-8s %12s %12s %12s' % ('document', 'format', 'bytes', 'encode ms', 'decode ms'))
+    for doc_name, doc in documents():
+        for name, field in fields:
+            encode = field.get_encoder()
+            stored = encode(doc)
+            print('%-10s %-8s %12d %12.3f %12.3f' % (
+                doc_name, name, len(stored), measure(lambda: encode(doc)) * 1000,
+                measure(lambda: field.to_python(stored)) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Compares the evaluate=True path of JSONFormField.clean(), now a literal
+parser, with the previous eval() and serialization round trip.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, measure, report
+setup()
+
+import datetime
+from decimal import Decimal
+
+from json_field.fields import JSONEncoder, JSONDecoder
+from json_field.forms import JSONFormField
+
+encode = JSONEncoder().encode
+decode = JSONDecoder(parse_float=Decimal).decode
+
+def legacy_clean(value):
+    """ The evaluate=True path shipped up to 0.5.7. """
+    value = value.replace('\\r', '').replace('\\n', '')
+    json_globals = {'__builtins__': None, 'datetime': datetime}
+    json_locals = {'null': None, 'true': True, 'false': False}
+    return decode(encode(eval(value, json_globals, json_locals)))
+
+def main():
+    field = JSONFormField(evaluate=True)
+    item = ('{"id": %d, "created": datetime.datetime(2012, 4, 23, 19, 16, 54, 133000), '
+            '"day": datetime.date(2014, 1, 1), "price": 1.25, "tags": ["a", "b"], "active": true}')
+    for count in (100, 10000):
+        text = '[%s]' % ',\n'.join(item % i for i in range(count))
+        assert legacy_clean(text) == field.clean(text)
+        print('%d items (%d KB)' % (count, len(text) // 1024))
+        baseline = measure(lambda: legacy_clean(text))
+        report('  eval round trip', baseline)
+        report('  literal parser', measure(lambda: field.clean(text)), baseline)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares a dumpdata/loaddata cycle with Django's "json" serializer and with
+json_field.serializers, which embeds JSON fields natively. The number of
+rows defaults to 1000000 and can be set with the ROWS environment variable.
+"""
+from __future__ import print_function, unicode_literals
+
+from benchmarks import setup, setup_database
+setup()
+setup_database()
+
+import datetime
+import io
+import os
+import tempfile
+import timeit
+
+from django.core import serializers
+from django.db import transaction
+
+from json_field import serializers as json_serializers
+from test_project.app.models import Test
+
+ROWS = int(os.environ.get('ROWS', 1000000))
+
+def populate():
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000)
+    Test.objects.all().delete()
+    Test.objects.bulk_create_json(
+        (Test(json={'id': i, 'created': now, 'lines': [{'sku': 'sku-%d' % j, 'qty': j} for j in range(10)]},
+              json_eager=None) for i in range(ROWS)),
+        batch_size=500)
+
+def dump(serializer, path):
+    with io.open(path, 'w', encoding='utf-8') as stream:
+        serializer.serialize(Test.objects.order_by('pk').iterator(), stream=stream)
+
+def load(deserializer, path):
+    with io.open(path, 'rb') as stream:
+        with transaction.atomic():
+            Test.objects.all().delete()
+            for obj in deserializer(stream):
+                obj.save()
+
+def time(func):
+    start = timeit.default_timer()
+    func()
+    return timeit.default_timer() - start
+
+def main():
+    populate()
+    print('%-20s %12s %12s %12s' % ('', 'dumpdata', 'loaddata', 'size'))
+    for name, serializer, deserializer in (
+            ('json', serializers.get_serializer('json')(), serializers.get_deserializer('json')),
+            ('json_field', json_serializers.Serializer(), json_serializers.Deserializer)):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            dump_time = time(lambda: dump(serializer, path))
+            size = os.path.getsize(path)
+            load_time = time(lambda: load(deserializer, path))
+        finally:
+            os.remove(path)
+        print('%-20s %10.2f s %10.2f s %9.1f MB' % (name, dump_time, load_time, size / 1e6))
+
+if __name__ == '__main__':
+    main()
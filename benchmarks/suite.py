@@ -0,0 +1,132 @@
+"""
+Benchmark suite covering encoding, decoding, ORM round trips and form
+cleaning for several document shapes and sizes, against SQLite.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 1,1024,51200 --json results.json
+    python -m benchmarks.suite --compare results.json
+
+Sizes are in KB. --json writes the results, and --compare prints how the
+current run relates to a previous one written that way.
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+from decimal import Decimal
+
+from benchmarks import setup, setup_database, measure
+setup()
+setup_database()
+
+import django
+from django.db import connection
+
+from json_field.backends import get_backend
+from test_project.app.forms import TestForm
+from test_project.app.models import Test
+
+def flat(i):
+    return {'key_%d' % i: 'value %d' % i, 'count_%d' % i: i, 'enabled_%d' % i: i % 2 == 0}
+
+def nested(i):
+    return {'a': {'b': {'c': {'d': [i, {'e': 'leaf %d' % i, 'f': [1, 2, {'g': None}]}]}}}}
+
+def dates(i):
+    now = datetime.datetime(2014, 5, 7, 12, 34, 56, 123000) + datetime.timedelta(minutes=i)
+    return {'created': now, 'day': now.date(), 'at': now.time(), 'label': 'event %d' % i}
+
+def decimals(i):
+    return {'amount': Decimal('%d.%02d' % (i, i % 100)), 'fee': Decimal('0.35'),
+            'rate': Decimal('1.0825'), 'currency': 'USD', 'account': i}
+
+SHAPES = {'flat': flat, 'nested': nested, 'dates': dates, 'decimals': decimals}
+
+def make_document(shape, size):
+    """ Returns a document of the given shape of about size bytes. """
+    make = SHAPES[shape]
+    item_size = len(Test._meta.get_field('json').get_db_prep_value(make(0), connection=connection))
+    count = max(1, size // item_size)
+    if shape == 'flat':
+        document = {}
+        for i in range(count):
+            document.update(make(i))
+        return document
+    return {'items': [make(i) for i in range(count)]}
+
+def bulk_rows(size):
+    """ The number of rows bulk benchmarks use, keeping them under 10 MB. """
+    return max(1, min(100, (10 * 1024 * 1024) // size))
+
+def run_document(shape, size, repeat):
+    field = Test._meta.get_field('json')
+    document = make_document(shape, size)
+    text = field.get_db_prep_value(document, connection=connection)
+    results = {}
+
+    results['encode'] = measure(lambda: field.get_db_prep_value(document, connection=connection), repeat=repeat)
+    results['decode'] = measure(lambda: field.to_python(text), repeat=repeat)
+    results['form_clean'] = measure(lambda: TestForm({'json': text}).is_valid(), repeat=repeat)
+
+    lazy_pk = Test.objects.create(json=document, json_eager=None).pk
+    eager_pk = Test.objects.create(json=None, json_eager=document).pk
+    results['create'] = measure(lambda: Test.objects.create(json=document, json_eager=None), repeat=repeat)
+    results['fetch_lazy'] = measure(lambda: Test.objects.get(pk=lazy_pk).json, repeat=repeat)
+    results['fetch_lazy_unused'] = measure(lambda: Test.objects.get(pk=lazy_pk), repeat=repeat)
+    results['fetch_eager'] = measure(lambda: Test.objects.get(pk=eager_pk).json_eager, repeat=repeat)
+
+    rows = bulk_rows(len(text))
+    Test.objects.all().delete()
+    results['bulk_create'] = measure(lambda: Test.objects.bulk_create(
+        [Test(json=document, json_eager=None) for i in range(rows)]), repeat=1)
+    results['bulk_fetch'] = measure(lambda: [obj.json for obj in Test.objects.iterator()], repeat=repeat)
+    results['bulk_decode_json'] = measure(lambda: list(Test.objects.decode_json('json')), repeat=repeat)
+    Test.objects.all().delete()
+
+    return len(text), rows, results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks django-json-field.')
+    parser.add_argument('--sizes', default='1,100,1024', help='document sizes in KB (default: 1,100,1024)')
+    parser.add_argument('--shapes', default=','.join(sorted(SHAPES)), help='document shapes')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each benchmark, the best is kept')
+    parser.add_argument('--json', metavar='PATH', help='write the results to PATH')
+    parser.add_argument('--compare', metavar='PATH', help='compare with results written by --json')
+    args = parser.parse_args(argv)
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            for result in json.load(f)['results']:
+                previous[(result['benchmark'], result['shape'], result['size_kb'])] = result['seconds']
+
+    output = {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'backend': get_backend().name,
+        'results': [],
+    }
+    for shape in args.shapes.split(','):
+        for size_kb in [int(size) for size in args.sizes.split(',')]:
+            length, rows, results = run_document(shape, size_kb * 1024, args.repeat)
+            print('%s, %d KB (%d bytes, %d bulk rows)' % (shape, size_kb, length, rows))
+            for name in sorted(results):
+                seconds = results[name]
+                line = '  %-24s %12.3f ms' % (name, seconds * 1000)
+                baseline = previous.get((name, shape, size_kb))
+                if baseline:
+                    line += '  (%.2fx)' % (baseline / seconds)
+                print(line)
+                output['results'].append({'benchmark': name, 'shape': shape, 'size_kb': size_kb,
+                                          'bytes': length, 'rows': rows, 'seconds': seconds})
+            sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
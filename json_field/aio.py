@@ -0,0 +1,90 @@
+"""
+Asynchronous encoding and decoding of JSON fields.
+
+Requires Python 3.5 or later. Values of at least JSON_FIELD_ASYNC_THRESHOLD
+characters (default: 65536) are decoded in an executor, a shared thread
+pool unless set_executor() is given another one, so large documents don't
+block the event loop. Smaller values are decoded inline.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+from django.conf import settings
+
+from json_field.fields import JSONField, Creator, BINARY_TYPES
+
+_executor = None
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(4)
+    return _executor
+
+def set_executor(executor):
+    """
+    Sets the concurrent.futures executor used for large values. A process
+    pool makes use of several cores, at the cost of sending values between
+    processes.
+    """
+    global _executor
+    _executor = executor
+
+def get_threshold():
+    return getattr(settings, 'JSON_FIELD_ASYNC_THRESHOLD', 65536)
+
+async def _run(func, value, offload):
+    if not offload:
+        return func(value)
+    return await asyncio.get_event_loop().run_in_executor(get_executor(), func, value)
+
+async def adecode(field, value):
+    """ Deserializes a database value of field. """
+    offload = isinstance(value, six.string_types + BINARY_TYPES) and len(value) >= get_threshold()
+    return await _run(field.to_python, value, offload)
+
+async def aencode(field, value):
+    """
+    Serializes value for field. Lists and dictionaries are serialized in the
+    executor, as their size isn't known beforehand.
+    """
+    return await _run(field.get_db_prep_value, value, isinstance(value, (list, tuple, dict)))
+
+async def aget_json_field(model_instance, name):
+    """ Returns the value of the named JSONField, deserializing it if needed. """
+    creator = getattr(model_instance.__class__, name, None)
+    if not isinstance(creator, Creator) or creator.is_deserialized(model_instance):
+        return getattr(model_instance, name)
+    value = await adecode(creator.field, model_instance.__dict__[creator.field.attname])
+    creator.set_deserialized(model_instance, value)
+    return value
+
+async def adecode_json(objs, *field_names):
+    """
+    Deserializes the JSON fields named (all of them by default) of model
+    instances concurrently, e.g. after fetching them with the async ORM.
+    Returns the instances.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    names = [field.name for field in objs[0]._meta.fields
+             if isinstance(field, JSONField) and (not field_names or field.name in field_names)]
+    # deferred fields would be loaded by a blocking query
+    await asyncio.gather(*[aget_json_field(obj, name) for obj in objs for name in names if name in obj.__dict__])
+    return objs
+
+async def adecode_queryset(queryset, *field_names):
+    """
+    Fetches a queryset, with the async ORM if Django has one and otherwise
+    in the calling thread, whose database connection (and transaction) it
+    has to use, and deserializes its JSON fields with adecode_json().
+    """
+    if hasattr(queryset, 'aiterator'): # django >= 4.1
+        objs = []
+        async for obj in queryset.aiterator():
+            objs.append(obj)
+    else:
+        objs = list(queryset.iterator())
+    return await adecode_json(objs, *field_names)
@@ -0,0 +1,218 @@
+from __future__ import unicode_literals
+
+try:
+    import json
+except ImportError:  # python < 2.6
+    from django.utils import simplejson as json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+import decimal
+import warnings
+from importlib import import_module
+
+DEFAULT_BACKEND = 'json'
+
+class JSONBackend(object):
+    """
+    Serializes values with the standard library, honoring every encoder and
+    decoder argument. Other backends fall back on it for anything they can't
+    reproduce exactly.
+    """
+
+    name = 'json'
+    module_name = 'json'
+
+    def __init__(self):
+        self.module = import_module(self.module_name)
+
+    def get_encoder(self, encoder_kwargs):
+        """
+        Returns a callable serializing a value to JSON text, or None if the
+        backend can't honor encoder_kwargs.
+        """
+        # Build the encoder once rather than on every json.dumps() call. It
+        # is shared between threads, which is safe as json.JSONEncoder keeps
+        # no state between calls.
+        options = dict(encoder_kwargs)
+        cls = options.pop('cls', None) or json.JSONEncoder
+        return cls(**options).encode
+
+    def get_decoder(self, decoder_kwargs):
+        """
+        Returns a callable deserializing JSON text, or None if the backend
+        can't honor decoder_kwargs.
+        """
+        options = dict(decoder_kwargs)
+        cls = options.pop('cls', None) or json.JSONDecoder
+        return cls(**options).decode
+
+class FastBackend(JSONBackend):
+    """
+    Base class for third party backends, which don't support the
+    JSONEncoder/JSONDecoder subclassing interface.
+
+    The encoder's default() method is passed to the backend so dates, times
+    and decimals are serialized exactly as the standard library would.
+    Decoders are supported if they are the stock json.JSONDecoder or define
+    a post_process(obj) static method converting an already parsed document
+    (see json_field.fields.JSONDecoder).
+    """
+
+    encoder_options = ()
+    decoder_options = ()
+
+    def encode(self, value, default, options):
+        raise NotImplementedError
+
+    def decode(self, value, options):
+        raise NotImplementedError
+
+    def get_encoder(self, encoder_kwargs):
+        options = dict(encoder_kwargs)
+        cls = options.pop('cls', None) or json.JSONEncoder
+        if not issubclass(cls, json.JSONEncoder) or \
+                cls.encode != json.JSONEncoder.encode or \
+                cls.iterencode != json.JSONEncoder.iterencode or \
+                not set(options).issubset(self.encoder_options):
+            return None
+        default = cls().default
+        fallback = JSONBackend.get_encoder(self, encoder_kwargs)
+        encode = self.encode
+
+        def encoder(value):
+            try:
+                return encode(value, default, options)
+            except (TypeError, ValueError, OverflowError):
+                return fallback(value) # let the standard library decide
+        return encoder
+
+    def get_decoder(self, decoder_kwargs):
+        options = dict(decoder_kwargs)
+        cls = options.pop('cls', None) or json.JSONDecoder
+        if cls is json.JSONDecoder:
+            post_process = None
+        elif 'post_process' in cls.__dict__:
+            post_process = cls.post_process
+        else:
+            return None
+        if not set(options).issubset(self.decoder_options):
+            return None
+        fallback = JSONBackend.get_decoder(self, decoder_kwargs)
+        decode = self.decode
+
+        def decoder(value):
+            try:
+                value = decode(value, options)
+            except ValueError:
+                return fallback(value) # let the standard library decide
+            return value if post_process is None else post_process(value)
+        return decoder
+
+class OrjsonBackend(FastBackend):
+    name = module_name = 'orjson'
+
+    encoder_options = ('sort_keys',)
+
+    def encode(self, value, default, options):
+        option = self.module.OPT_PASSTHROUGH_DATETIME | self.module.OPT_NON_STR_KEYS
+        if options.get('sort_keys'):
+            option |= self.module.OPT_SORT_KEYS
+        return self.module.dumps(value, default=default, option=option).decode('utf-8')
+
+    def decode(self, value, options):
+        return self.module.loads(value)
+
+class UjsonBackend(FastBackend):
+    name = module_name = 'ujson'
+
+    def get_encoder(self, encoder_kwargs):
+        return None # decimals are written as numbers without consulting default()
+
+    def decode(self, value, options):
+        return self.module.loads(value)
+
+class RapidjsonBackend(FastBackend):
+    name = module_name = 'rapidjson'
+
+    encoder_options = ('sort_keys',)
+    decoder_options = ('parse_float',)
+
+    def encode(self, value, default, options):
+        mapping_mode = self.module.MM_COERCE_KEYS_TO_STRINGS
+        if options.get('sort_keys'):
+            mapping_mode |= self.module.MM_SORT_KEYS
+        return self.module.dumps(value, default=default, mapping_mode=mapping_mode,
+                                 datetime_mode=self.module.DM_NONE)
+
+    def get_decoder(self, decoder_kwargs):
+        if decoder_kwargs.get('parse_float', decimal.Decimal) is not decimal.Decimal:
+            return None
+        return super(RapidjsonBackend, self).get_decoder(decoder_kwargs)
+
+    def decode(self, value, options):
+        if options.get('parse_float'):
+            return self.module.loads(value, number_mode=self.module.NM_DECIMAL)
+        return self.module.loads(value)
+
+class SimdjsonBackend(FastBackend):
+    name = module_name = 'simdjson'
+
+    def get_encoder(self, encoder_kwargs):
+        return None # pysimdjson only parses
+
+    def decode(self, value, options):
+        return self.module.loads(value)
+
+BACKENDS = {}
+
+_backends = {}
+
+def register_backend(cls):
+    """ Makes a backend class available by its name. """
+    BACKENDS[cls.name] = cls
+    _backends.pop(cls.name, None)
+    return cls
+
+for backend_cls in (JSONBackend, OrjsonBackend, UjsonBackend, RapidjsonBackend, SimdjsonBackend):
+    register_backend(backend_cls)
+
+def get_backend(name=None):
+    """
+    Returns the backend instance registered as name, defaulting to the
+    JSON_FIELD_BACKEND setting. Backends whose library is not installed fall
+    back to the standard library with a warning.
+    """
+    if name is None:
+        name = getattr(settings, 'JSON_FIELD_BACKEND', DEFAULT_BACKEND)
+    try:
+        return _backends[name]
+    except KeyError:
+        pass
+    try:
+        backend = BACKENDS[name]()
+    except KeyError:
+        raise ImproperlyConfigured('Unknown JSON backend "%s".' % name)
+    except ImportError:
+        warnings.warn('The "%s" library is not installed, using "%s" instead.' % (name, DEFAULT_BACKEND))
+        backend = get_backend(DEFAULT_BACKEND)
+    _backends[name] = backend
+    return backend
+
+def get_codec(name, encoder_kwargs, decoder_kwargs, cache):
+    """
+    Returns the (encoder, decoder) callables of the named backend, falling
+    back on the standard library for whichever it can't handle. They are
+    built once and kept in cache, a dictionary owned by the caller.
+    """
+    backend = get_backend(name)
+    try:
+        return cache[backend.name]
+    except KeyError:
+        pass
+    default = get_backend(DEFAULT_BACKEND)
+    encoder = backend.get_encoder(encoder_kwargs) or default.get_encoder(encoder_kwargs)
+    decoder = backend.get_decoder(decoder_kwargs) or default.get_decoder(decoder_kwargs)
+    codec = cache[backend.name] = (encoder, decoder)
+    return codec
@@ -0,0 +1,63 @@
+"""
+Caching of deserialized JSON values.
+"""
+from __future__ import unicode_literals
+
+import threading
+from collections import OrderedDict
+
+from six.moves import cPickle as pickle
+
+_MISSING = object()
+
+class DecodeCache(object):
+    """
+    Bounded LRU cache of deserialized values keyed by their JSON text.
+
+    Values are kept pickled and a fresh copy is returned on every hit, so
+    callers can't modify each other's values, unless copy is False because
+    they are immutable. Texts longer than max_length are always decoded.
+    """
+
+    def __init__(self, size, max_length=None, copy=True):
+        self.size = size
+        self.max_length = max_length
+        self.copy = copy
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def decode(self, text, decode):
+        """ Returns the value of text, calling decode(text) on a miss. """
+        if self.max_length is not None and len(text) > self.max_length:
+            return decode(text)
+        with self._lock:
+            entry = self._entries.pop(text, _MISSING)
+            if entry is not _MISSING:
+                self._entries[text] = entry # most recently used
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not _MISSING:
+            return pickle.loads(entry) if self.copy else entry
+
+        value = entry = decode(text)
+        if self.copy:
+            try:
+                entry = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            except Exception: # values of custom decoders may not be picklable
+                return value
+        with self._lock:
+            self._entries[text] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,89 @@
+"""
+Compression of stored JSON.
+
+Compressed values start with a null byte, which can't start JSON text,
+followed by a byte identifying the codec. Anything else is returned as is,
+to be read as plain JSON (so existing rows stay readable) or in a binary
+format (see json_field.formats).
+"""
+from __future__ import unicode_literals
+
+from django.core.exceptions import ImproperlyConfigured
+
+from importlib import import_module
+
+MAGIC = b'\x00'
+
+class ZlibCodec(object):
+    name = 'zlib'
+    id = 1
+    module_name = 'zlib'
+
+    def __init__(self):
+        self.module = import_module(self.module_name)
+
+    def compress(self, data):
+        return self.module.compress(data)
+
+    def decompress(self, data):
+        return self.module.decompress(data)
+
+class ZstdCodec(ZlibCodec):
+    name = 'zstd'
+    id = 2
+    module_name = 'zstandard'
+
+    def compress(self, data):
+        return self.module.ZstdCompressor().compress(data)
+
+    def decompress(self, data):
+        return self.module.ZstdDecompressor().decompress(data)
+
+class Lz4Codec(ZlibCodec):
+    name = 'lz4'
+    id = 3
+    module_name = 'lz4.frame'
+
+CODECS = dict((codec.name, codec) for codec in (ZlibCodec, ZstdCodec, Lz4Codec))
+CODEC_IDS = dict((codec.id, codec) for codec in CODECS.values())
+
+_codecs = {}
+
+def get_codec(name):
+    """ Returns the codec instance registered as name or with id name. """
+    try:
+        return _codecs[name]
+    except KeyError:
+        pass
+    try:
+        cls = CODEC_IDS[name] if isinstance(name, int) else CODECS[name]
+    except KeyError:
+        raise ImproperlyConfigured('Unknown compression codec "%s".' % name)
+    try:
+        codec = _codecs[name] = cls()
+    except ImportError:
+        raise ImproperlyConfigured('The "%s" library is required to use "%s" compression and was not found.' % (
+            cls.module_name, cls.name))
+    return codec
+
+def is_compressed(data):
+    """ Whether data (bytes) was written by compress(). """
+    data = bytes(data[:2])
+    return len(data) == 2 and data[:1] == MAGIC and bytearray(data[1:2])[0] in CODEC_IDS
+
+def compress(data, codec_name, threshold=0):
+    """
+    Compresses data (bytes) with the named codec, unless it is shorter than
+    threshold.
+    """
+    if len(data) < threshold:
+        return data
+    codec = get_codec(codec_name)
+    return MAGIC + bytes(bytearray([codec.id])) + codec.compress(data)
+
+def decompress(data):
+    """ Returns data uncompressed, passing uncompressed data through. """
+    data = bytes(data)
+    if not is_compressed(data): # may be in a binary format
+        return data
+    return get_codec(bytearray(data[1:2])[0]).decompress(data[2:])
@@ -0,0 +1,171 @@
+"""
+Query expressions for JSON fields.
+
+Requires Django 1.8 or later.
+"""
+from __future__ import unicode_literals
+
+import six
+
+from django.db.models import TextField
+from django.db.models.expressions import Func
+
+from json_field.utils import json_path
+
+class JSONExtract(Func):
+    """
+    Selects the JSON text found at path (a sequence of object keys and
+    integer array indexes) within a JSON column, or NULL if it is missing.
+    """
+
+    vendors = ('sqlite', 'postgresql', 'mysql')
+
+    def __init__(self, expression, path, **extra):
+        extra.setdefault('output_field', TextField())
+        super(JSONExtract, self).__init__(expression, **extra)
+        self.path = list(path)
+
+    @classmethod
+    def supports(cls, connection):
+        if connection.vendor == 'sqlite':
+            return connection.Database.sqlite_version_info >= (3, 9, 0) # json1
+        return connection.vendor in cls.vendors
+
+    def json_path(self, connection=None):
+        return json_path(self.path, connection)
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError('JSON extraction is not supported on %s.' % connection.vendor)
+
+    def as_sqlite(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        if connection.Database.sqlite_version_info >= (3, 38, 0):
+            # keeps numbers as written instead of converting them to REAL
+            return '(%s -> %%s)' % sql, params + [self.json_path(connection)]
+        return 'json_quote(json_extract(%s, %%s))' % sql, params + [self.json_path(connection)]
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        path = [six.text_type(key) for key in self.path]
+        return '(CAST(%s AS jsonb) #> %%s::text[])::text' % sql, params + [path]
+
+    def as_mysql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return 'JSON_EXTRACT(%s, %%s)' % sql, params + [self.json_path()]
+
+class JSONUpdate(Func):
+    """
+    Base class of the expressions updating a JSONField (expression) in the
+    database. Literal values are serialized with the field's encoder.
+    """
+
+    vendors = ('sqlite', 'postgresql', 'mysql')
+
+    @classmethod
+    def supports(cls, connection, field):
+        if field.binary:
+            return False
+        if connection.vendor == 'sqlite':
+            return connection.Database.sqlite_version_info >= (3, 18, 0) # json_patch
+        return connection.vendor in cls.vendors
+
+    def encode(self, value):
+        return self.output_field.get_codec()[0](value)
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError('JSON updates are not supported on %s.' % connection.vendor)
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        if not getattr(self.output_field, 'jsonb', False):
+            sql = 'CAST(%s AS jsonb)' % sql
+        sql, params = self.as_jsonb(compiler, sql, params)
+        if not getattr(self.output_field, 'jsonb', False):
+            sql = '(%s)::text' % sql
+        return sql, params
+
+class JSONSet(JSONUpdate):
+    """
+    Sets the value at path (a sequence of object keys and integer array
+    indexes) within a JSON column to value, a literal or an expression.
+    """
+
+    def __init__(self, expression, path, value, **extra):
+        self.path = list(path)
+        self.is_literal = not hasattr(value, 'resolve_expression')
+        if self.is_literal:
+            self.value = value
+            super(JSONSet, self).__init__(expression, **extra)
+        else:
+            super(JSONSet, self).__init__(expression, value, **extra)
+
+    def compile_value(self, compiler, template, literal_template):
+        if self.is_literal:
+            return literal_template, [self.encode(self.value)]
+        sql, params = compiler.compile(self.source_expressions[1])
+        return template % sql, params
+
+    def as_sqlite(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        value, value_params = self.compile_value(compiler, '%s', 'json(%s)')
+        return 'json_set(%s, %%s, %s)' % (sql, value), params + [json_path(self.path, connection)] + value_params
+
+    def as_mysql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        value, value_params = self.compile_value(compiler, '%s', 'CAST(%s AS JSON)')
+        return 'JSON_SET(%s, %%s, %s)' % (sql, value), params + [json_path(self.path)] + value_params
+
+    def as_jsonb(self, compiler, sql, params):
+        value, value_params = self.compile_value(compiler, 'to_jsonb(%s)', '%s::jsonb')
+        path = [six.text_type(key) for key in self.path]
+        return 'jsonb_set(%s, %%s::text[], %s, true)' % (sql, value), params + [path] + value_params
+
+class JSONPatch(JSONUpdate):
+    """
+    Applies a JSON merge patch (RFC 7396) to a JSON column: the keys of
+    patch replace those of the column's object, recursively for objects,
+    and keys set to None are removed.
+    """
+
+    def __init__(self, expression, patch, **extra):
+        super(JSONPatch, self).__init__(expression, **extra)
+        self.patch = patch
+
+    def as_sqlite(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return 'json_patch(%s, json(%%s))' % sql, params + [self.encode(self.patch)]
+
+    def as_mysql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return 'JSON_MERGE_PATCH(%s, %%s)' % sql, params + [self.encode(self.patch)]
+
+    def as_jsonb(self, compiler, sql, params):
+        if not isinstance(self.patch, dict): # replaces the document
+            return '%s::jsonb', [self.encode(self.patch)]
+        return self.merge(sql, params, self.patch, 0)
+
+    def merge(self, sql, params, patch, depth):
+        # PostgreSQL has no merge patch function: the object (or {} if the
+        # target isn't one) is bound once per level by a subquery, removed
+        # keys are subtracted, plain values concatenated and nested objects
+        # merged recursively
+        target = 'v%d' % depth
+        expression, expression_params = target, []
+        removed = [key for key, value in patch.items() if value is None]
+        if removed:
+            expression = '(%s - %%s::text[])' % expression
+            expression_params.append(removed)
+        values = dict((key, value) for key, value in patch.items()
+                      if value is not None and not isinstance(value, dict))
+        if values:
+            expression = '(%s || %%s::jsonb)' % expression
+            expression_params.append(self.encode(values))
+        for key, value in patch.items():
+            if isinstance(value, dict):
+                nested, nested_params = self.merge('(%s -> %%s)' % target, [key], value, depth + 1)
+                expression = '(%s || jsonb_build_object(%%s::text, %s))' % (expression, nested)
+                expression_params += [key] + nested_params
+        return ("(SELECT %s FROM (SELECT CASE WHEN jsonb_typeof(x%d) = 'object' THEN x%d ELSE '{}'::jsonb END "
+                "AS %s FROM (SELECT %s AS x%d) AS s%d) AS t%d)" % (
+                    expression, depth, depth, target, sql, depth, depth, depth),
+                expression_params + params)
@@ -1,7 +1,16 @@
 from __future__ import unicode_literals
 
 from json_field.utils import is_aware
-from json_field.forms import JSONFormField
+from json_field.forms import JSONFormField, UNCHANGED
+from json_field.backends import get_codec
+from json_field import compression, formats, streaming, stats
+from json_field.cache import DecodeCache
+from json_field.frozen import freeze
+from json_field.indexes import JSONPathIndex
+try:
+    from json_field import lookups
+except ImportError: # django < 1.7
+    lookups = None
 
 try:
     import json
@@ -9,6 +18,7 @@ except ImportError:  # python < 2.6
     from django.utils import simplejson as json
 
 from django.db import models
+from django.db.models import signals
 from django.core import exceptions
 from django.utils.translation import ugettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured
@@ -17,6 +27,7 @@ import re
 import decimal
 import datetime
 import six
+from six.moves import cPickle as pickle
 try:
     from dateutil import parser as date_parser
 except ImportError:
@@ -35,105 +46,491 @@ TIME_RE = re.compile(r'^(%s)$' % TIME_FMT)
 DATE_RE = re.compile(r'^(%s)$' % DATE_FMT)
 DATETIME_RE = re.compile(r'^(%s)T(%s)(%s)?$' % (DATE_FMT, TIME_FMT, TIMEZONE_FMT))
 
+# See "Date Time String Format" in the ECMA-262 specification.
+
+def encode_datetime(o):
+    r = o.isoformat()
+    if o.tzinfo is None: # no offset to rewrite
+        return r[:23] if o.microsecond else r
+    if o.microsecond:
+        r = r[:23] + r[26:]
+    if r.endswith('+00:00'):
+        r = r[:-6] + 'Z'
+    return r
+
+def encode_time(o):
+    if is_aware(o):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:12]
+    return r
+
 class JSONEncoder(json.JSONEncoder):
     """
     JSONEncoder subclass that knows how to encode date/time and decimal types.
     """
+
+    # looked up by exact type first, as default() is called for every one
+    # of these values in a document
+    encoders = {
+        datetime.datetime: encode_datetime,
+        datetime.date: datetime.date.isoformat,
+        datetime.time: encode_time,
+        decimal.Decimal: str,
+    }
+
     def default(self, o):
-        # See "Date Time String Format" in the ECMA-262 specification.
+        encode = self.encoders.get(o.__class__)
+        if encode is not None:
+            return encode(o)
+        # subclasses
         if isinstance(o, datetime.datetime):
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:23] + r[26:]
-            if r.endswith('+00:00'):
-                r = r[:-6] + 'Z'
-            return r
+            return encode_datetime(o)
         elif isinstance(o, datetime.date):
             return o.isoformat()
         elif isinstance(o, datetime.time):
-            if is_aware(o):
-                raise ValueError("JSON can't represent timezone-aware times.")
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:12]
-            return r
+            return encode_time(o)
         elif isinstance(o, decimal.Decimal):
             return str(o)
         else:
             return super(JSONEncoder, self).default(o)
 
+def _fromisoformat(cls):
+    # datetime.fromisoformat() only exists on Python 3.7+, dateutil covers the rest
+    return getattr(cls, 'fromisoformat', None)
+
+_time_fromisoformat = _fromisoformat(datetime.time)
+_date_fromisoformat = _fromisoformat(datetime.date)
+_datetime_fromisoformat = _fromisoformat(datetime.datetime)
+
+def _parse(value, fromisoformat, parse):
+    result = None
+    if fromisoformat is not None:
+        try:
+            result = fromisoformat(value)
+        except ValueError:
+            pass
+    if result is None:
+        result = parse(value)
+    if stats.counting:
+        stats.count_conversion()
+    return result
+
+def parse_time(value):
+    return _parse(value, _time_fromisoformat, lambda value: date_parser.parse(value).time())
+
+def parse_date(value):
+    return _parse(value, _date_fromisoformat, lambda value: date_parser.parse(value).date())
+
+def parse_datetime(value):
+    return _parse(value, _datetime_fromisoformat, date_parser.parse)
+
+def decode_string(value):
+    """
+    Converts a date, time or datetime formatted string to its Python
+    equivalent, returning any other string unchanged.
+    """
+    # Every supported format is at least 8 characters long and is
+    # recognizable by its third or fifth character, which lets the vast
+    # majority of strings skip the regular expressions entirely.
+    if len(value) < 8:
+        return value
+    try:
+        if value[2] == ':':
+            if TIME_RE.match(value):
+                return parse_time(value)
+        elif value[4] == '-':
+            if len(value) == 10:
+                if DATE_RE.match(value):
+                    return parse_date(value)
+            elif DATETIME_RE.match(value):
+                return parse_datetime(value)
+    except ValueError:
+        pass
+    return value
+
+def _decode_list(obj):
+    # dicts have already been converted by the object hook
+    for i, item in enumerate(obj):
+        if isinstance(item, six.string_types):
+            obj[i] = decode_string(item)
+        elif type(item) is list:
+            _decode_list(item)
+    return obj
+
+def _decode_pairs(pairs):
+    for i, (key, value) in enumerate(pairs):
+        if isinstance(value, six.string_types):
+            pairs[i] = (key, decode_string(value))
+        elif type(value) is list:
+            _decode_list(value)
+    return pairs
+
+def _decode_dict(obj):
+    for key, value in obj.items():
+        if isinstance(value, six.string_types):
+            obj[key] = decode_string(value)
+        elif type(value) is list:
+            _decode_list(value)
+    return obj
+
+def decode_value(obj):
+    """
+    Converts date/time strings anywhere within an already parsed document.
+    """
+    if isinstance(obj, six.string_types):
+        return decode_string(obj)
+    elif type(obj) is list:
+        for i, item in enumerate(obj):
+            obj[i] = decode_value(item)
+    elif type(obj) is dict:
+        for key, value in obj.items():
+            obj[key] = decode_value(value)
+    return obj
+
 class JSONDecoder(json.JSONDecoder):
-    """ Recursive JSON to Python deserialization. """
-
-    _recursable_types = ([str] if six.PY3 else [str, unicode]) + [list, dict]
-
-    def _is_recursive(self, obj):
-        return type(obj) in JSONDecoder._recursable_types
-
-    def decode(self, obj, *args, **kwargs):
-        if not kwargs.get('recurse', False):
-            obj = super(JSONDecoder, self).decode(obj, *args, **kwargs)
-        if isinstance(obj, list):
-            for i in six.moves.xrange(len(obj)):
-                item = obj[i]
-                if self._is_recursive(item):
-                    obj[i] = self.decode(item, recurse=True)
-        elif isinstance(obj, dict):
-            for key, value in obj.items():
-                if self._is_recursive(value):
-                    obj[key] = self.decode(value, recurse=True)
-        elif isinstance(obj, six.string_types):
-            if TIME_RE.match(obj):
-                try:
-                    return date_parser.parse(obj).time()
-                except ValueError:
-                    pass
-            if DATE_RE.match(obj):
-                try:
-                    return date_parser.parse(obj).date()
-                except ValueError:
-                    pass
-            if DATETIME_RE.match(obj):
-                try:
-                    return date_parser.parse(obj)
-                except ValueError:
-                    pass
+    """
+    JSONDecoder subclass that converts date/time strings while parsing.
+
+    Objects are converted by an object hook as soon as the scanner builds
+    them, so the document is only walked once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        object_hook = kwargs.pop('object_hook', None)
+        object_pairs_hook = kwargs.pop('object_pairs_hook', None)
+        if object_pairs_hook is not None:
+            kwargs['object_pairs_hook'] = lambda pairs: object_pairs_hook(_decode_pairs(pairs))
+        elif object_hook is not None:
+            kwargs['object_hook'] = lambda obj: object_hook(_decode_dict(obj))
+        else:
+            kwargs['object_hook'] = _decode_dict
+        super(JSONDecoder, self).__init__(*args, **kwargs)
+
+    # used by backends that parse without hooks
+    post_process = staticmethod(decode_value)
+
+    def decode(self, s, *args, **kwargs):
+        obj = super(JSONDecoder, self).decode(s, *args, **kwargs)
+        # top level strings and lists are not seen by the object hook
+        if isinstance(obj, six.string_types):
+            return decode_string(obj)
+        elif type(obj) is list:
+            return _decode_list(obj)
         return obj
 
+def parse_decimal(value):
+    if isinstance(value, float):
+        value = repr(value)
+    return decimal.Decimal(value)
+
+SCHEMA_TYPES = {
+    'datetime': (parse_datetime, six.string_types),
+    'date': (parse_date, six.string_types),
+    'time': (parse_time, six.string_types),
+    'decimal': (parse_decimal, six.string_types + six.integer_types + (float,)),
+}
+SCHEMA_TYPES[datetime.datetime] = SCHEMA_TYPES['datetime']
+SCHEMA_TYPES[datetime.date] = SCHEMA_TYPES['date']
+SCHEMA_TYPES[datetime.time] = SCHEMA_TYPES['time']
+SCHEMA_TYPES[decimal.Decimal] = SCHEMA_TYPES['decimal']
+
+def compile_schema(schema):
+    """
+    Compiles a dictionary mapping dotted paths (where * matches every item
+    of an array or object) to a type into a tree of nested dictionaries,
+    in which the None key holds the conversion of a node.
+    """
+    tree = {}
+    for path, type in schema.items():
+        try:
+            conversion = SCHEMA_TYPES[type]
+        except (KeyError, TypeError):
+            raise ImproperlyConfigured('Unsupported schema type %r for "%s".' % (type, path))
+        node = tree
+        for key in path.split('.') if path else []:
+            node = node.setdefault(key, {})
+        node[None] = conversion
+    return tree
+
+def apply_schema(obj, node):
+    """ Converts the values of obj declared by a compiled schema node. """
+    conversion = node.get(None)
+    if conversion is not None:
+        parse, types = conversion
+        if isinstance(obj, types) and not isinstance(obj, bool):
+            try:
+                return parse(obj)
+            except (ValueError, OverflowError, decimal.InvalidOperation):
+                return obj
+    if type(obj) is dict:
+        for key, child in node.items():
+            if key == '*':
+                for name, value in obj.items():
+                    obj[name] = apply_schema(value, child)
+            elif key is not None and key in obj:
+                obj[key] = apply_schema(obj[key], child)
+    elif type(obj) is list:
+        child = node.get('*')
+        if child is not None:
+            for i, item in enumerate(obj):
+                obj[i] = apply_schema(item, child)
+    return obj
+
+def schema_at(tree, keys):
+    """
+    Returns the compiled schema of the values found at keys (where '*'
+    stands for every item) within documents of the compiled schema tree.
+    """
+    nodes = [tree]
+    for key in keys:
+        key = six.text_type(key)
+        nodes = [child for node in nodes for child in (node.get(key), node.get('*') if key != '*' else None)
+                 if child is not None]
+    merged = {}
+    def merge(into, node):
+        for key, child in node.items():
+            if key is None:
+                into.setdefault(None, child)
+            else:
+                merge(into.setdefault(key, {}), child)
+    for node in nodes:
+        merge(merged, node)
+    return merged
+
+class SchemaDecoder(json.JSONDecoder):
+    """
+    JSONDecoder subclass that only converts the values declared by a schema
+    (see compile_schema) instead of every date/time formatted string.
+
+    The schema is passed as an argument, or set on a subclass returned by
+    for_schema(), whose post_process() can be used by backends that parse
+    without hooks.
+    """
+
+    schema = {} # compiled
+
+    def __init__(self, *args, **kwargs):
+        schema = kwargs.pop('schema', None)
+        if schema is not None:
+            self.schema = compile_schema(schema)
+        super(SchemaDecoder, self).__init__(*args, **kwargs)
+
+    @classmethod
+    def for_schema(cls, schema, compiled=False):
+        """ Returns a subclass applying schema, compiled or not. """
+        return type(cls)(str(cls.__name__), (cls,), {
+            'schema': schema if compiled else compile_schema(schema),
+            'post_process': SchemaDecoder.__dict__['post_process'],
+        })
+
+    @classmethod
+    def post_process(cls, obj):
+        return apply_schema(obj, cls.schema)
+
+    def decode(self, s, *args, **kwargs):
+        return apply_schema(super(SchemaDecoder, self).decode(s, *args, **kwargs), self.schema)
+
+BINARY_TYPES = (six.binary_type, bytearray, memoryview)
+
+STORED_TYPES = six.string_types + BINARY_TYPES
+
+def read_binary(value):
+    """
+    Returns a binary database value uncompressed, as text unless it is in a
+    binary format.
+    """
+    value = compression.decompress(value)
+    return value if formats.is_encoded(value) else value.decode('utf-8')
+
+class RawJSON(object):
+    """
+    JSON text that is passed to the database verbatim, possibly as stored
+    by a compressed field.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
 class Creator(object):
     """
     Taken from django.db.models.fields.subclassing.
+
+    Also remembers the JSON text stored in the database for each instance so
+    saving an unchanged value doesn't have to serialize it again.
     """
 
     _state_key = '_json_field_state'
+    _raw_key = '_json_field_raw'
+    _snapshot_key = '_json_field_snapshot'
+    _pending_key = '_json_field_pending'
 
     def __init__(self, field, lazy):
         self.field = field
         self.lazy = lazy
 
+    def _get_dict(self, obj, key):
+        value = getattr(obj, key, None)
+        if value is None:
+            value = {}
+            setattr(obj, key, value)
+        return value
+
     def __get__(self, obj, type=None):
         if obj is None:
             return self
 
+        decoded = False
         if self.lazy:
-            state = getattr(obj, self._state_key, None)
-            if state is None:
-                state = {}
-                setattr(obj, self._state_key, state)
+            state = self._get_dict(obj, self._state_key)
 
             if state.get(self.field.name, False):
-                return obj.__dict__[self.field.name]
-
-            value = self.field.to_python(obj.__dict__[self.field.name])
-            obj.__dict__[self.field.name] = value
-            state[self.field.name] = True
+                value = obj.__dict__[self.field.name]
+            else:
+                value = self.field.to_python(obj.__dict__[self.field.name])
+                self.set_deserialized(obj, value)
+                decoded = True
         else:
             value = obj.__dict__[self.field.name]
 
+        callback = stats.get_callback()
+        if callback is not None:
+            callback('access', self.field, lazy=self.lazy, decoded=decoded)
         return value
 
+    def is_deserialized(self, obj):
+        return not self.lazy or getattr(obj, self._state_key, {}).get(self.field.name, False)
+
+    def set_deserialized(self, obj, value):
+        """ Replaces the database value of obj by its deserialized value. """
+        obj.__dict__[self.field.name] = value
+        self._get_dict(obj, self._state_key)[self.field.name] = True
+        self._keep_stored_json(obj, value)
+
+    def _keep_stored_json(self, obj, value):
+        # the stored text of a deserialized value is only reused if changes
+        # are tracked, otherwise it is dropped rather than kept in memory
+        raw = self._get_dict(obj, self._raw_key)
+        if not self.field.track_changes:
+            raw.pop(self.field.name, None)
+        elif self.field.name in raw:
+            self._get_dict(obj, self._snapshot_key)[self.field.name] = self.field.get_snapshot(value)
+
     def __set__(self, obj, value):
-        obj.__dict__[self.field.name] = value if self.lazy else self.field.to_python(value)
+        raw = self._get_dict(obj, self._raw_key)
+        model_state = getattr(obj, '_state', None)
+        if isinstance(value, STORED_TYPES) and model_state is not None and model_state.adding:
+            # this is the database text if obj is being loaded by a queryset,
+            # which is only known for sure once adding is unset
+            raw[self.field.name] = value
+        else:
+            raw.pop(self.field.name, None)
+
+        if self.lazy:
+            obj.__dict__[self.field.name] = value
+            self._get_dict(obj, self._state_key)[self.field.name] = False
+        else:
+            value = obj.__dict__[self.field.name] = self.field.to_python(value)
+            self._keep_stored_json(obj, value)
+
+    def get_stored_json(self, obj):
+        """
+        Returns the JSON text stored in the database for obj if its current
+        value is known to be unchanged, otherwise None.
+        """
+        if obj._state.adding:
+            return None
+        text = getattr(obj, self._raw_key, {}).get(self.field.name)
+        if text is None:
+            return None
+        if not self.is_deserialized(obj):
+            return text
+        if self.field.track_changes:
+            snapshot = getattr(obj, self._snapshot_key, {}).get(self.field.name)
+            if snapshot is not None and snapshot == self.field.get_snapshot(obj.__dict__[self.field.name]):
+                return text
+        return None
+
+    def is_dirty(self, obj):
+        return self.get_stored_json(obj) is None
+
+    def set_pending_json(self, obj, text, value):
+        """
+        Records text as being saved for obj, which is only known to be
+        stored once the save succeeded (see commit_pending_json).
+        """
+        self._get_dict(obj, self._pending_key)[self.field.name] = (text, value)
+
+    def set_stored_json(self, obj, text, value):
+        """ Records text as the JSON stored in the database for obj. """
+        self._get_dict(obj, self._raw_key)[self.field.name] = text
+        if self.is_deserialized(obj):
+            self._keep_stored_json(obj, value)
+
+def clear_pending_json(sender, instance, **kwargs):
+    """ pre_save handler forgetting the text of an earlier save that failed. """
+    instance.__dict__.pop(Creator._pending_key, None)
+
+def commit_pending_json(sender, instance, **kwargs):
+    """ post_save handler recording the text written by the save as stored. """
+    pending = instance.__dict__.pop(Creator._pending_key, None)
+    if pending:
+        for name, (text, value) in pending.items():
+            creator = getattr(instance.__class__, name, None)
+            if isinstance(creator, Creator):
+                creator.set_stored_json(instance, text, value)
+
+signals.pre_save.connect(clear_pending_json, dispatch_uid='json_field_clear_pending_json')
+signals.post_save.connect(commit_pending_json, dispatch_uid='json_field_commit_pending_json')
+
+def aget_json_field(model_instance, name):
+    """
+    Returns an awaitable of the value of the named JSONField, deserialized
+    without blocking the event loop if it is large (see json_field.aio).
+    """
+    from json_field import aio
+    return aio.aget_json_field(model_instance, name)
+
+def _json_update(model_instance, name, method, *args):
+    from json_field.query import JSONQuerySet
+    field = model_instance._meta.get_field(name)
+    queryset = JSONQuerySet(model_instance.__class__, using=model_instance._state.db).filter(pk=model_instance.pk)
+    getattr(queryset, method)(name, *args)
+    # reload the updated document, which is then known to be unchanged
+    text = queryset.values_list(field.attname, flat=True).get()
+    setattr(model_instance, field.attname, text)
+    creator = getattr(model_instance.__class__, field.attname, None)
+    if isinstance(creator, Creator):
+        creator.set_stored_json(model_instance, text, model_instance.__dict__[field.attname])
+
+def json_set(model_instance, name, path, value):
+    """
+    Sets the value at path within the named JSONField of the instance in
+    the database (see JSONQuerySet.json_set()) and reloads the field.
+    """
+    _json_update(model_instance, name, 'json_set', path, value)
+
+def json_patch(model_instance, name, patch):
+    """
+    Merges patch into the named JSONField of the instance in the database
+    (see JSONQuerySet.json_patch()) and reloads the field.
+    """
+    _json_update(model_instance, name, 'json_patch', patch)
+
+def get_dirty_json_fields(model_instance):
+    """
+    Returns the names of the JSON fields whose value may differ from the
+    database. Accessed values of fields without track_changes always count
+    as dirty.
+    """
+    dirty = []
+    for field in model_instance._meta.fields:
+        if isinstance(field, JSONField) and field.attname in model_instance.__dict__:
+            creator = getattr(model_instance.__class__, field.attname, None)
+            if not isinstance(creator, Creator) or creator.is_dirty(model_instance):
+                dirty.append(field.name)
+    return dirty
 
 class JSONField(models.TextField):
     """ Stores and loads valid JSON objects. """
@@ -148,13 +545,43 @@ class JSONField(models.TextField):
         self.evaluate_formfield = kwargs.pop('evaluate_formfield', False)
 
         self.lazy = kwargs.pop('lazy', True)
+        self.track_changes = kwargs.pop('track_changes', False)
+        self.compress = kwargs.pop('compress', None)
+        if self.compress is True:
+            self.compress = 'zlib'
+        if self.compress:
+            compression.get_codec(self.compress) # fail early if unavailable
+        self.compress_threshold = kwargs.pop('compress_threshold', 1024)
+        self.format = kwargs.pop('format', None)
+        if self.format == 'json':
+            self.format = None
+        if self.format:
+            formats.get_format(self.format) # fail early if unavailable
+        self.indexed_paths = [JSONPathIndex(index) if isinstance(index, six.string_types) else index
+                              for index in kwargs.pop('indexed_paths', ())]
+        if self.indexed_paths and self.binary:
+            raise ImproperlyConfigured('Paths of compressed or binary JSON fields can not be indexed.')
+        self.backend = kwargs.pop('backend', None)
+        self._codecs = {}
+        self.frozen = kwargs.pop('frozen', False)
+        decode_cache_size = kwargs.pop('decode_cache_size', 0)
+        decode_cache_max_length = kwargs.pop('decode_cache_max_length', 65536)
+        self.decode_cache = None
+        if decode_cache_size:
+            # frozen values can be shared instead of copied
+            self.decode_cache = DecodeCache(decode_cache_size, decode_cache_max_length, copy=not self.frozen)
+        self.schema = kwargs.pop('schema', None)
+        if self.schema:
+            compile_schema(self.schema) # fail early if invalid
         encoder = kwargs.pop('encoder', JSONEncoder)
-        decoder = kwargs.pop('decoder', JSONDecoder)
+        decoder = kwargs.pop('decoder', SchemaDecoder if self.schema else JSONDecoder)
         encoder_kwargs = kwargs.pop('encoder_kwargs', {})
         decoder_kwargs = kwargs.pop('decoder_kwargs', {})
         if not encoder_kwargs and encoder:
             encoder_kwargs.update({'cls':encoder})
         if not decoder_kwargs and decoder:
+            if self.schema and issubclass(decoder, SchemaDecoder):
+                decoder = decoder.for_schema(self.schema)
             decoder_kwargs.update({'cls':decoder, 'parse_float':decimal.Decimal})
         self.encoder_kwargs = encoder_kwargs
         self.decoder_kwargs = decoder_kwargs
@@ -167,33 +594,260 @@ class JSONField(models.TextField):
     def db_type(self, *args, **kwargs):
         if self._db_type:
             return self._db_type
+        if self.binary:
+            return models.BinaryField().db_type(*args, **kwargs)
         return super(JSONField, self).db_type(*args, **kwargs)
 
+    def deconstruct(self):
+        name, path, args, kwargs = super(JSONField, self).deconstruct()
+        if self._db_type:
+            kwargs['db_type'] = self._db_type
+        if self.compress:
+            kwargs['compress'] = self.compress
+        if self.format:
+            kwargs['format'] = self.format
+        if self.indexed_paths:
+            kwargs['indexed_paths'] = self.indexed_paths
+        return name, path, args, kwargs
+
+    @property
+    def binary(self):
+        """ Whether the column is binary, holding compressed values or a binary format. """
+        return bool(self.compress or self.format)
+
+    @property
+    def jsonb(self):
+        """ Whether the column is a PostgreSQL jsonb column. """
+        return self._db_type == 'jsonb'
+
+    def select_format(self, compiler, sql, params):
+        # let the column be deserialized lazily instead of by psycopg2
+        if self.jsonb and compiler.connection.vendor == 'postgresql':
+            return '%s::text' % sql, params
+        return super(JSONField, self).select_format(compiler, sql, params)
+
+    def get_lookup(self, lookup_name):
+        if self.jsonb and lookup_name in lookups.JSONB_LOOKUPS:
+            return lookups.JSONB_LOOKUPS[lookup_name]
+        return super(JSONField, self).get_lookup(lookup_name)
+
+    def get_transform(self, name):
+        transform = super(JSONField, self).get_transform(name)
+        if transform is None and self.indexed_paths:
+            return lookups.PathTransformFactory(name)
+        if transform is None and self.jsonb:
+            return lookups.KeyTransformFactory(name)
+        return transform
+
+    def get_path_index(self, keys):
+        """ Returns the JSONPathIndex of keys, or None if they aren't indexed. """
+        for index in self.indexed_paths:
+            if index.keys == keys:
+                return index
+        return None
+
+    def get_codec(self):
+        """
+        Returns the (encoder, decoder) callables of the configured backend.
+        """
+        return get_codec(self.backend, self.encoder_kwargs, self.decoder_kwargs, self._codecs)
+
+    def get_encoder(self):
+        encode = formats.get_encoder(self.format) if self.format else self.get_codec()[0]
+        callback = stats.get_callback()
+        if callback is not None:
+            encode = stats.instrument_encoder(callback, self, encode)
+        return encode
+
+    def get_decoder(self):
+        decode = self.get_codec()[1]
+        if self.binary:
+            decode_text = decode
+            decode = lambda data: formats.decode(data) if isinstance(data, bytes) else decode_text(data)
+        callback = stats.get_callback()
+        if callback is not None:
+            decode = stats.instrument_decoder(callback, self, decode)
+        if self.frozen:
+            unfrozen = decode
+            decode = lambda text: freeze(unfrozen(text))
+        if self.decode_cache is not None:
+            cache, uncached = self.decode_cache, decode
+            decode = lambda text: cache.decode(text, uncached)
+        return decode
+
     def to_python(self, value):
         if value is None: # allow blank objects
             return None
-        if isinstance(value, six.string_types):
+        if isinstance(value, BINARY_TYPES):
+            value = read_binary(value)
+        if isinstance(value, STORED_TYPES):
             try:
-                value = json.loads(value, **self.decoder_kwargs)
+                value = self.get_decoder()(value)
             except JSON_DECODE_ERROR:
                 pass
+        if self.frozen:
+            value = freeze(value)
         return value
 
+    def get_prep_value(self, value):
+        return value # serialized by get_db_prep_value
+
+    def adecode(self, value):
+        """ Returns an awaitable deserializing value, see json_field.aio. """
+        from json_field import aio
+        return aio.adecode(self, value)
+
+    def aencode(self, value):
+        """ Returns an awaitable serializing value, see json_field.aio. """
+        from json_field import aio
+        return aio.aencode(self, value)
+
+    def iter_json(self, model_instance, path='item'):
+        """
+        Yields the items found at path (in ijson syntax, e.g. 'items.item')
+        within the value of model_instance. If the value hasn't been
+        deserialized yet it is decoded incrementally from the database text,
+        so the whole document is never built.
+        """
+        creator = getattr(model_instance.__class__, self.attname, None)
+        if isinstance(creator, Creator) and not creator.is_deserialized(model_instance):
+            value = model_instance.__dict__[self.attname]
+            if isinstance(value, BINARY_TYPES):
+                value = compression.decompress(value)
+            if isinstance(value, STORED_TYPES) and not formats.is_encoded(value):
+                keys = ['*' if key == 'item' else key for key in path.split('.')] if path else []
+                cls = self.get_path_decoder_class(keys)
+                return streaming.iter_items(value, path,
+                    use_float=self.decoder_kwargs.get('parse_float') is not decimal.Decimal,
+                    post_process=getattr(cls, 'post_process', None))
+        return streaming.iter_path(getattr(model_instance, self.attname), path)
+
+    def get_path_decoder_class(self, keys):
+        """
+        Returns the decoder class of the values found at keys within the
+        documents, whose schema (if any) applies from there.
+        """
+        cls = self.decoder_kwargs.get('cls')
+        if keys and isinstance(cls, type) and issubclass(cls, SchemaDecoder):
+            schema = self.decoder_kwargs.get('schema')
+            tree = compile_schema(schema) if schema is not None else cls.schema
+            cls = cls.for_schema(schema_at(tree, keys), compiled=True)
+        return cls
+
+    def get_path_decoder(self, keys):
+        """
+        Returns a callable deserializing the values extracted at keys from
+        the documents, e.g. by json_values().
+        """
+        cls = self.get_path_decoder_class(keys)
+        if cls is self.decoder_kwargs.get('cls'):
+            return self.to_python
+        decoder_kwargs = dict(self.decoder_kwargs, cls=cls)
+        decoder_kwargs.pop('schema', None)
+        decode = get_codec(self.backend, self.encoder_kwargs, decoder_kwargs, {})[1]
+        def to_python(value):
+            if isinstance(value, STORED_TYPES):
+                try:
+                    value = decode(value)
+                except JSON_DECODE_ERROR:
+                    pass
+            return freeze(value) if self.frozen else value
+        return to_python
+
+    def decode_many(self, values):
+        """ Deserializes a sequence of database values. """
+        decode = self.get_decoder()
+        results = []
+        for value in values:
+            if isinstance(value, BINARY_TYPES):
+                value = read_binary(value)
+            if isinstance(value, STORED_TYPES):
+                try:
+                    value = decode(value)
+                except JSON_DECODE_ERROR:
+                    pass
+            if self.frozen:
+                value = freeze(value)
+            results.append(value)
+        return results
+
     def get_db_prep_value(self, value, *args, **kwargs):
-        if self.null and value is None and not kwargs.get('force'):
+        connection = kwargs.get('connection', args[0] if args else None)
+        if isinstance(value, RawJSON):
+            text = value.text
+        elif self.null and value is None and not kwargs.get('force'):
+            return None
+        else:
+            text = self.get_encoder()(value)
+        if self.binary and connection is not None:
+            if not isinstance(text, BINARY_TYPES):
+                text = text.encode('utf-8')
+            if self.compress and not compression.is_compressed(text):
+                text = compression.compress(text, self.compress, self.compress_threshold)
+            return connection.Database.Binary(text)
+        return text
+
+    def get_snapshot(self, value):
+        """
+        Returns a representation of value that differs whenever its JSON
+        would, or None if it can't be taken.
+        """
+        try:
+            return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception: # unpicklable values are always considered changed
             return None
-        return json.dumps(value, **self.encoder_kwargs)
+
+    def pre_save(self, model_instance, add):
+        creator = getattr(model_instance.__class__, self.attname, None)
+        if not isinstance(creator, Creator):
+            return super(JSONField, self).pre_save(model_instance, add)
+        text = creator.get_stored_json(model_instance)
+        if text is not None:
+            return RawJSON(text)
+        value = getattr(model_instance, self.attname)
+        if self.null and value is None:
+            return None
+        text = self.get_db_prep_value(value)
+        creator.set_pending_json(model_instance, text, value)
+        return RawJSON(text)
+
+    def get_json_text(self, model_instance):
+        """
+        Returns the JSON text of the value of model_instance, reusing the
+        text stored in the database if the value is unchanged, or None if
+        the value is null.
+        """
+        creator = getattr(model_instance.__class__, self.attname, None)
+        text = creator.get_stored_json(model_instance) if isinstance(creator, Creator) else None
+        if isinstance(text, BINARY_TYPES):
+            text = read_binary(text)
+        if text is None or isinstance(text, bytes): # stored in a binary format
+            value = getattr(model_instance, self.attname)
+            if self.null and value is None:
+                return None
+            encode = self.get_codec()[0] if self.format else self.get_encoder()
+            return encode(value)
+        return text
 
     def value_to_string(self, obj):
-        return self.get_db_prep_value(self._get_val_from_obj(obj))
+        if obj is None:
+            return self.get_db_prep_value(self.get_default())
+        return self.get_json_text(obj)
 
     def value_from_object(self, obj):
-        return json.dumps(super(JSONField, self).value_from_object(obj), **self.encoder_kwargs)
+        # the stored text is passed through unless the value was changed
+        text = self.get_json_text(obj)
+        return text if text is not None else self.get_codec()[0](None)
+
+    def save_form_data(self, instance, data):
+        if data is not UNCHANGED: # not rendered by JSONWidget, see json_field.forms
+            super(JSONField, self).save_form_data(instance, data)
 
     def formfield(self, **kwargs):
         defaults = {
             'form_class': kwargs.get('form_class', JSONFormField),
             'evaluate': self.evaluate_formfield,
+            'backend': self.backend,
             'encoder_kwargs': self.encoder_kwargs,
             'decoder_kwargs': self.decoder_kwargs,
         }
@@ -203,14 +857,23 @@ class JSONField(models.TextField):
     def contribute_to_class(self, cls, name):
         super(JSONField, self).contribute_to_class(cls, name)
 
-        def get_json(model_instance):
-            return self.get_db_prep_value(getattr(model_instance, self.attname, None), force=True)
+        def get_json(model_instance): # JSON text, whatever the format
+            return self.value_from_object(model_instance)
         setattr(cls, 'get_%s_json' % self.name, get_json)
 
         def set_json(model_instance, value):
             return setattr(model_instance, self.attname, self.to_python(value))
         setattr(cls, 'set_%s_json' % self.name, set_json)
 
+        def iter_json(model_instance, path='item'):
+            return self.iter_json(model_instance, path)
+        setattr(cls, 'iter_%s_json' % self.name, iter_json)
+
+        setattr(cls, 'get_dirty_json_fields', get_dirty_json_fields)
+        setattr(cls, 'aget_json_field', aget_json_field)
+        setattr(cls, 'json_set', json_set)
+        setattr(cls, 'json_patch', json_patch)
+
         setattr(cls, name, Creator(self, lazy=self.lazy)) # deferred deserialization
 
 try:
@@ -221,7 +884,9 @@ try:
             (JSONField,),
             [],
             {
-                'db_type': ['_db_type', {'default': None}]
+                'db_type': ['_db_type', {'default': None}],
+                'compress': ['compress', {'default': None}],
+                'format': ['format', {'default': None}],
             }
         )
     ]
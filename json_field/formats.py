@@ -0,0 +1,139 @@
+"""
+Binary storage formats.
+
+Values stored in a binary format start with a null byte, which can't start
+JSON text, followed by a byte identifying the format, as compressed values
+do (see json_field.compression) but with identifiers of their own. Dates,
+times, datetimes and decimals are tagged with their type, so they are
+restored without looking at strings, and timezone-aware times are kept.
+"""
+from __future__ import unicode_literals
+
+import datetime
+import decimal
+from importlib import import_module
+
+from django.core.exceptions import ImproperlyConfigured
+
+MAGIC = b'\x00'
+
+# MessagePack extension types and CBOR tags of values without a standard
+# representation, holding their ISO 8601 (or decimal) text
+DATETIME, DATE, TIME, DECIMAL = 1, 2, 3, 4
+CBOR_TAGS = {DATETIME: 55801, TIME: 55803} # naive datetimes and times
+
+def _get_parsers():
+    from json_field.fields import parse_datetime, parse_date, parse_time
+    return {DATETIME: parse_datetime, DATE: parse_date, TIME: parse_time, DECIMAL: decimal.Decimal}
+
+class MsgpackFormat(object):
+    name = 'msgpack'
+    id = 16
+    module_name = 'msgpack'
+
+    def __init__(self):
+        self.module = import_module(self.module_name)
+        ExtType = self.module.ExtType
+        self.ext_types = {
+            datetime.datetime: lambda o: ExtType(DATETIME, o.isoformat().encode('ascii')),
+            datetime.date: lambda o: ExtType(DATE, o.isoformat().encode('ascii')),
+            datetime.time: lambda o: ExtType(TIME, o.isoformat().encode('ascii')),
+            decimal.Decimal: lambda o: ExtType(DECIMAL, str(o).encode('ascii')),
+        }
+        self.parsers = _get_parsers()
+
+    def default(self, o):
+        try:
+            return self.ext_types[type(o)](o)
+        except KeyError:
+            for cls, encode in self.ext_types.items():
+                if isinstance(o, cls):
+                    return encode(o)
+        raise TypeError('%r is not serializable' % (o,))
+
+    def ext_hook(self, code, data):
+        try:
+            parse = self.parsers[code]
+        except KeyError:
+            return self.module.ExtType(code, data)
+        return parse(data.decode('ascii'))
+
+    def dumps(self, value):
+        return self.module.packb(value, default=self.default, use_bin_type=True, datetime=False)
+
+    def loads(self, data):
+        return self.module.unpackb(data, ext_hook=self.ext_hook, raw=False, strict_map_key=False)
+
+class CborFormat(object):
+    name = 'cbor'
+    id = 17
+    module_name = 'cbor2'
+
+    def __init__(self):
+        self.module = import_module(self.module_name)
+        self.encoders = {
+            datetime.datetime: self.encode_datetime,
+            datetime.time: self.encode_time,
+        }
+        parsers = _get_parsers()
+        self.tag_parsers = dict((number, parsers[type_id]) for type_id, number in CBOR_TAGS.items())
+
+    def encode_datetime(self, encoder, o):
+        if o.tzinfo is not None and o.utcoffset() is not None:
+            encoder.encode_datetime(o) # standard tag 0
+        else:
+            encoder.encode(self.module.CBORTag(CBOR_TAGS[DATETIME], o.isoformat()))
+
+    def encode_time(self, encoder, o):
+        encoder.encode(self.module.CBORTag(CBOR_TAGS[TIME], o.isoformat()))
+
+    def tag_hook(self, *args):
+        # called with (decoder, tag), or (tag, immutable) by recent cbor2 versions
+        tag = args[1] if isinstance(args[1], self.module.CBORTag) else args[0]
+        parse = self.tag_parsers.get(tag.tag)
+        return tag if parse is None else parse(tag.value)
+
+    def dumps(self, value):
+        # dates and decimals use the standard tags 1004 and 4
+        return self.module.dumps(value, encoders=self.encoders)
+
+    def loads(self, data):
+        return self.module.loads(data, tag_hook=self.tag_hook)
+
+FORMATS = dict((format.name, format) for format in (MsgpackFormat, CborFormat))
+FORMAT_IDS = dict((format.id, format) for format in FORMATS.values())
+
+_formats = {}
+
+def get_format(name):
+    """ Returns the format instance registered as name or with id name. """
+    try:
+        return _formats[name]
+    except KeyError:
+        pass
+    try:
+        cls = FORMAT_IDS[name] if isinstance(name, int) else FORMATS[name]
+    except KeyError:
+        raise ImproperlyConfigured('Unknown storage format "%s".' % name)
+    try:
+        format = _formats[name] = cls()
+    except ImportError:
+        raise ImproperlyConfigured('The "%s" library is required to use the "%s" format and was not found.' % (
+            cls.module_name, cls.name))
+    return format
+
+def is_encoded(data):
+    """ Whether data (bytes) was written by the encoder of a format. """
+    return len(data) > 1 and data[:1] == MAGIC and bytearray(data[1:2])[0] in FORMAT_IDS
+
+def get_encoder(name):
+    """ Returns a callable serializing values to bytes in the named format. """
+    format = get_format(name)
+    prefix = MAGIC + bytes(bytearray([format.id]))
+    dumps = format.dumps
+    return lambda value: prefix + dumps(value)
+
+def decode(data):
+    """ Deserializes bytes written by the encoder of any format. """
+    data = bytes(data)
+    return get_format(bytearray(data[1:2])[0]).loads(data[2:])
@@ -2,25 +2,163 @@ try:
     import json
 except ImportError:  # python < 2.6
     from django.utils import simplejson as json
-from django.forms import fields, util
+from django.forms import fields, util, widgets
+from django.utils.html import format_html
+from django.utils.translation import ugettext_lazy as _
 
-import datetime
+from json_field.backends import get_codec
+from json_field import literal
+
+import re
 from decimal import Decimal
 
+import six
+
+# characters the limits pre-scan stops at: brackets, commas and the quotes
+# starting strings, which are skipped whole (see JSONFormField.check_limits)
+STRUCTURE_RE = re.compile(r'[\[\]{},"]')
+# the same with the single quoted strings and parentheses of json_field.literal
+EVALUATE_STRUCTURE_RE = re.compile(r'[\[\]{}(),"\']')
+STRING_END_RES = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+
+class Unchanged(object):
+    """ Submitted value of a document a JSONWidget didn't render in full. """
+
+    def __repr__(self):
+        return 'UNCHANGED'
+
+UNCHANGED = Unchanged()
+
+class JSONWidget(widgets.Textarea):
+    """
+    Textarea that renders documents longer than max_length characters as a
+    truncated, read-only preview. Their value is then submitted as
+    UNCHANGED, which JSONField leaves alone when saving a model form.
+    """
+
+    def __init__(self, attrs=None, max_length=None):
+        super(JSONWidget, self).__init__(attrs)
+        self.max_length = max_length
+
+    def render(self, name, value, attrs=None, **kwargs):
+        if self.max_length is None or not isinstance(value, six.string_types) or len(value) <= self.max_length:
+            return super(JSONWidget, self).render(name, value, attrs, **kwargs)
+        final_attrs = dict(self.attrs, readonly='readonly')
+        final_attrs.update(attrs or {})
+        return format_html(
+            '<textarea{0}>\r\n{1}</textarea><input type="hidden" name="{2}" value="1" />'
+            '<p class="help">{3}</p>',
+            util.flatatt(final_attrs), value[:self.max_length], '%s_unchanged' % name,
+            _('Showing the first %(shown)d of %(length)d characters, the document can\'t be edited here.') % {
+                'shown': self.max_length, 'length': len(value)})
+
+    def value_from_datadict(self, data, files, name):
+        if '%s_unchanged' % name in data:
+            return UNCHANGED
+        return super(JSONWidget, self).value_from_datadict(data, files, name)
+
 class JSONFormField(fields.Field):
 
+    default_error_messages = {
+        'max_bytes': _('Ensure this value has at most %(max_bytes)s bytes.'),
+        'max_depth': _('Ensure this value is nested at most %(max_depth)s levels deep.'),
+        'max_items': _('Ensure no array or object in this value has more than %(max_items)s items.'),
+    }
+
     def __init__(self, *args, **kwargs):
         from .fields import JSONEncoder, JSONDecoder
 
         self.evaluate = kwargs.pop('evaluate', False)
+        self.max_bytes = kwargs.pop('max_bytes', None)
+        self.max_depth = kwargs.pop('max_depth', None)
+        self.max_items = kwargs.pop('max_items', None)
+        self.backend = kwargs.pop('backend', None)
         self.encoder_kwargs = kwargs.pop('encoder_kwargs', {'cls':JSONEncoder})
         self.decoder_kwargs = kwargs.pop('decoder_kwargs', {'cls':JSONDecoder, 'parse_float':Decimal})
+        self._codecs = {}
 
         kwargs.pop('max_length', None)
 
         super(JSONFormField, self).__init__(*args, **kwargs)
 
+    def get_codec(self):
+        return get_codec(self.backend, self.encoder_kwargs, self.decoder_kwargs, self._codecs)
+
+    def check_limits(self, value):
+        """
+        Rejects value as soon as it is found to exceed max_bytes, max_depth
+        or max_items, before it is parsed.
+        """
+        if self.max_bytes is not None and len(value) * 4 > self.max_bytes and \
+                (len(value) > self.max_bytes or len(value.encode('utf-8')) > self.max_bytes):
+            raise util.ValidationError(self.error_messages['max_bytes'], code='max_bytes',
+                                       params={'max_bytes': self.max_bytes})
+        if self.max_depth is None and self.max_items is None:
+            return
+        max_depth = self.max_depth if self.max_depth is not None else float('inf')
+        max_items = self.max_items if self.max_items is not None else float('inf')
+        # a single pass, in which each search starts where the last ended
+        search = (EVALUATE_STRUCTURE_RE if self.evaluate else STRUCTURE_RE).search
+        counts = [] # commas seen in each enclosing array, object or tuple, None in calls
+        depth = 0 # arrays, objects and tuples in counts
+        position = 0
+        while True:
+            match = search(value, position)
+            if match is None:
+                break
+            position = match.end()
+            token = value[match.start()]
+            if token == '"' or token == "'":
+                position = self._skip_string(value, position, STRING_END_RES[token].search)
+            elif token == ',':
+                if counts and counts[-1] is not None:
+                    counts[-1] += 1
+                    if counts[-1] >= max_items:
+                        raise util.ValidationError(self.error_messages['max_items'], code='max_items',
+                                                   params={'max_items': self.max_items})
+            elif token == '(' and self._is_call(value, match.start()):
+                counts.append(None)
+            elif token == '[' or token == '{' or token == '(':
+                counts.append(0)
+                depth += 1
+                if depth > max_depth:
+                    raise util.ValidationError(self.error_messages['max_depth'], code='max_depth',
+                                               params={'max_depth': self.max_depth})
+            elif counts: # closing
+                if counts.pop() is not None:
+                    depth -= 1
+
+    @staticmethod
+    def _skip_string(value, position, search):
+        """ Returns the position following the string starting before position. """
+        while True:
+            match = search(value, position)
+            if match is None: # unterminated
+                return len(value)
+            if value[match.start()] != '\\':
+                return match.end()
+            position = match.end() + 1 # escaped character
+
+    @staticmethod
+    def _is_call(value, position):
+        """ Whether the parenthesis at position follows a name, e.g. datetime.date( """
+        position -= 1
+        while position >= 0 and value[position].isspace():
+            position -= 1
+        return position >= 0 and (value[position].isalnum() or value[position] in '_.')
+
+    def bound_data(self, data, initial):
+        return initial if data is UNCHANGED else data
+
+    def has_changed(self, initial, data):
+        if data is UNCHANGED:
+            return False
+        return super(JSONFormField, self).has_changed(initial, data)
+
     def clean(self, value):
+        if value is UNCHANGED:
+            return value
+
         # Have to jump through a few hoops to make this reliable
         value = super(JSONFormField, self).clean(value)
 
@@ -28,26 +166,34 @@ class JSONFormField(fields.Field):
         if value is None:
             return value
 
-        ## Got to get rid of newlines for validation to work
-        # Data newlines are escaped so this is safe
-        value = value.replace('\r', '').replace('\n', '')
-
-        if self.evaluate:
-            json_globals = { # "safety" first!
-                '__builtins__': None,
-                'datetime': datetime,
-            }
-            json_locals = { # value compatibility
-                'null': None,
-                'true': True,
-                'false': False,
-            }
+        self.check_limits(value)
+        decode = self.get_codec()[1]
+
+        # Valid JSON is decoded as is. Otherwise newlines are removed, which
+        # accepts them within strings, and the value is evaluated if enabled.
+        try:
+            return decode(value)
+        except ValueError as e:
+            error = e
+        if '\r' in value or '\n' in value:
+            value = value.replace('\r', '').replace('\n', '')
             try:
-                value = json.dumps(eval(value, json_globals, json_locals), **self.encoder_kwargs)
-            except Exception as e: # eval can throw many different errors
-                raise util.ValidationError(str(e))
+                return decode(value)
+            except ValueError as e:
+                error = e
+        if not self.evaluate:
+            raise util.ValidationError(str(error))
+
+        try:
+            value = literal.parse(value, self.decoder_kwargs.get('parse_float'), self.max_depth)
+        except ValueError as e:
+            raise util.ValidationError(str(e))
+        post_process = getattr(self.decoder_kwargs.get('cls'), 'post_process', None)
+        if post_process is not None:
+            return post_process(value)
 
+        # let other decoders see the value as JSON
         try:
-            return json.loads(value, **self.decoder_kwargs)
+            return decode(self.get_codec()[0](value))
         except ValueError as e:
             raise util.ValidationError(str(e))
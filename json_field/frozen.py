@@ -0,0 +1,78 @@
+"""
+Immutable JSON values.
+
+FrozenDict and FrozenList subclass dict and list, so they compare equal to
+and serialize like their mutable counterparts, but refuse modification and
+are hashable. Copying them returns the same object.
+"""
+from __future__ import unicode_literals
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError("'%s' object is immutable" % self.__class__.__name__)
+
+class FrozenDict(dict):
+    __slots__ = ('_hash',)
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return 'FrozenDict(%s)' % dict.__repr__(self)
+
+class FrozenList(list):
+    __slots__ = ('_hash',)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = extend = insert = pop = remove = \
+        reverse = sort = clear = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(self))
+            return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return 'FrozenList(%s)' % list.__repr__(self)
+
+def freeze(value):
+    """ Returns value with its dictionaries and lists made immutable. """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    elif isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+def thaw(value):
+    """ Returns a mutable copy of a frozen value. """
+    if isinstance(value, dict):
+        return dict((key, thaw(item)) for key, item in value.items())
+    elif isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
@@ -0,0 +1,95 @@
+"""
+Indexed paths of JSON fields.
+
+Each path listed in the indexed_paths of a JSONField is mirrored by a
+generated column with a B-tree index, which json__<path> lookups select
+instead of the document. The columns are created by the
+json_field.operations.AddJSONPathIndexes migration operation, on SQLite
+3.31+, PostgreSQL 12+ and MySQL 5.7+.
+"""
+from __future__ import unicode_literals
+
+import six
+from django.db import models
+try:
+    from django.db.backends.utils import truncate_name
+except ImportError: # django < 1.7
+    from django.db.backends.util import truncate_name
+
+from json_field.utils import json_path
+
+def _quote_literal(value):
+    return "'%s'" % value.replace("'", "''")
+
+class JSONPathIndex(object):
+    """
+    A path within a JSONField, e.g. 'user.id', to index as output_field
+    (default: CharField(max_length=255)). Digits are array indexes.
+    """
+
+    def __init__(self, path, output_field=None, name=None):
+        self.path = path
+        self.keys = [int(key) if key.isdigit() else key for key in path.split('.')]
+        self.output_field = output_field if output_field is not None else models.CharField(max_length=255)
+        self.name = name
+
+    def deconstruct(self):
+        kwargs = {'output_field': self.output_field}
+        if self.name:
+            kwargs['name'] = self.name
+        return ('json_field.indexes.JSONPathIndex', [self.path], kwargs)
+
+    def __eq__(self, other):
+        return isinstance(other, JSONPathIndex) and self.path == other.path and self.name == other.name and \
+            self.output_field.deconstruct()[1:] == other.output_field.deconstruct()[1:]
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<JSONPathIndex: %s>' % self.path
+
+    def get_column(self, field):
+        return '__'.join([field.column] + [six.text_type(key) for key in self.keys])
+
+    def get_index_name(self, model, field, connection):
+        name = self.name or '%s_%s_idx' % (model._meta.db_table, self.get_column(field))
+        return truncate_name(name, connection.ops.max_name_length())
+
+    def get_expression_sql(self, field, connection):
+        column = connection.ops.quote_name(field.column)
+        if connection.vendor == 'postgresql':
+            path = 'ARRAY[%s]' % ', '.join(_quote_literal(six.text_type(key)) for key in self.keys)
+            if field.jsonb:
+                return '(%s #>> %s)' % (column, path)
+            return '(CAST(%s AS jsonb) #>> %s)' % (column, path)
+        if connection.vendor == 'mysql':
+            return 'JSON_UNQUOTE(JSON_EXTRACT(%s, %s))' % (column, _quote_literal(json_path(self.keys)))
+        return 'json_extract(%s, %s)' % (column, _quote_literal(json_path(self.keys, connection)))
+
+    def create_sql(self, model, field, connection):
+        """ Returns the statements adding the generated column and its index. """
+        quote_name = connection.ops.quote_name
+        db_type = self.output_field.db_type(connection)
+        expression = self.get_expression_sql(field, connection)
+        if connection.vendor == 'postgresql':
+            expression = 'CAST(%s AS %s)' % (expression, db_type)
+        return [
+            'ALTER TABLE %s ADD COLUMN %s %s GENERATED ALWAYS AS (%s) %s' % (
+                quote_name(model._meta.db_table), quote_name(self.get_column(field)), db_type, expression,
+                'STORED' if connection.vendor == 'postgresql' else 'VIRTUAL'),
+            'CREATE INDEX %s ON %s (%s)' % (
+                quote_name(self.get_index_name(model, field, connection)), quote_name(model._meta.db_table),
+                quote_name(self.get_column(field))),
+        ]
+
+    def drop_sql(self, model, field, connection):
+        """ Returns the statements dropping the index and the generated column. """
+        quote_name = connection.ops.quote_name
+        drop_index = 'DROP INDEX %s' % quote_name(self.get_index_name(model, field, connection))
+        if connection.vendor == 'mysql':
+            drop_index += ' ON %s' % quote_name(model._meta.db_table)
+        return [
+            drop_index,
+            'ALTER TABLE %s DROP COLUMN %s' % (quote_name(model._meta.db_table), quote_name(self.get_column(field))),
+        ]
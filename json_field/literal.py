@@ -0,0 +1,202 @@
+"""
+Parser for the dialect accepted by JSONFormField(evaluate=True): JSON,
+Python literals (single quoted strings, tuples, True/False/None) and calls
+to the datetime constructors, e.g.
+
+    {"date": datetime.datetime(2012, 4, 23, 19, 16, 54, 133000)}
+
+Nothing is evaluated: the text is tokenized and parsed in a single pass.
+"""
+from __future__ import unicode_literals
+
+import ast
+import datetime
+import re
+from json import decoder
+
+import six
+
+# the last alternative catches any other character so it is reported. Strings
+# run to the end of the text if unterminated, which is checked by the parser,
+# so that no alternative fails after scanning far ahead and all is linear.
+TOKEN_RE = re.compile(r'''\s*(
+    "(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?
+  | [-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?
+  | [A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*
+  | \S
+)''', re.VERBOSE | re.DOTALL)
+
+NUMBER_START = set('0123456789+-.')
+NAME_START = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+
+CONSTANTS = {
+    'null': None, 'true': True, 'false': False,
+    'None': None, 'True': True, 'False': False,
+}
+
+CALLABLES = {
+    'datetime.datetime': datetime.datetime,
+    'datetime.date': datetime.date,
+    'datetime.time': datetime.time,
+    'datetime.datetime.now': datetime.datetime.now,
+    'datetime.datetime.utcnow': datetime.datetime.utcnow,
+    'datetime.date.today': datetime.date.today,
+}
+
+DEFAULT_MAX_DEPTH = 100
+
+RecursionError = getattr(six.moves.builtins, 'RecursionError', RuntimeError)
+
+def is_string(token):
+    """ Whether token is a terminated string, its closing quote not escaped. """
+    if len(token) < 2 or token[-1] != token[0]:
+        return False
+    return (len(token) - len(token[:-1].rstrip('\\')) - 1) % 2 == 0
+
+class Parser(object):
+
+    def __init__(self, text, parse_float=None, max_depth=None):
+        # all in one go, kinds are told by the first character; trailing
+        # whitespace is stripped as \s* would rescan it before each position
+        matches = list(TOKEN_RE.finditer(text.rstrip()))
+        self.tokens = [match.group(1) for match in matches]
+        self.tokens.append(None)
+        self.positions = [match.start(1) for match in matches]
+        self.index = 0
+        self.token = self.tokens[0]
+        self.parse_float = parse_float or float
+        self.max_depth = max_depth or DEFAULT_MAX_DEPTH
+        self.depth = 0
+
+    def advance(self):
+        self.index += 1
+        self.token = self.tokens[self.index]
+
+    def error(self, message=None, index=None):
+        if index is None:
+            index = self.index
+        if self.tokens[index] is None:
+            return ValueError('Unexpected end of value')
+        return ValueError('%s at position %d' % (message or 'Unexpected %r' % self.tokens[index],
+                                                 self.positions[index]))
+
+    def expect(self, token):
+        if self.token != token:
+            raise self.error('Expected %r' % token)
+        self.advance()
+
+    def parse(self):
+        try:
+            value = self.value()
+        except RecursionError:
+            raise ValueError('Nesting too deep')
+        if self.token is not None:
+            raise self.error()
+        return value
+
+    def value(self):
+        token = self.token
+        if token is None:
+            raise self.error()
+        first = token[0]
+        if first == '"' or first == "'":
+            if not is_string(token):
+                raise self.error('Unterminated string')
+            try:
+                if first == '"':
+                    value = decoder.scanstring(token, 1)[0]
+                else:
+                    value = ast.literal_eval('u' + token)
+            except (SyntaxError, ValueError) as e:
+                raise self.error('Invalid string (%s)' % e)
+            self.advance()
+            return value
+        elif first in NUMBER_START and token not in ('+', '-', '.'):
+            self.advance()
+            if token.lstrip('+-').isdigit():
+                return int(token)
+            return self.parse_float(token)
+        elif first in NAME_START:
+            self.advance()
+            if token in CONSTANTS:
+                return CONSTANTS[token]
+            if token in CALLABLES and self.token == '(':
+                return self.call(CALLABLES[token])
+            raise ValueError('Unknown name %r' % token)
+        elif token == '{' or token == '[' or token == '(':
+            self.enter()
+            self.advance()
+            if token == '{':
+                value = self.dict()
+            else:
+                value = self.sequence(']' if token == '[' else ')')
+            self.depth -= 1
+            return value
+        raise self.error()
+
+    def enter(self):
+        self.depth += 1
+        if self.depth > self.max_depth:
+            raise self.error('Nesting deeper than %d levels' % self.max_depth)
+
+    def dict(self):
+        value = {}
+        while self.token != '}':
+            index = self.index
+            key = self.value()
+            if isinstance(key, (list, dict, datetime.date, datetime.time)):
+                raise self.error('Keys must be strings, numbers, booleans or null', index)
+            if isinstance(key, bool) or key is None:
+                key = {True: 'true', False: 'false', None: 'null'}[key]
+            elif not isinstance(key, six.string_types):
+                key = six.text_type(key)
+            self.expect(':')
+            value[key] = self.value()
+            if self.token != '}':
+                self.expect(',')
+        self.advance()
+        return value
+
+    def sequence(self, end):
+        value = []
+        comma = False
+        while self.token != end:
+            value.append(self.value())
+            comma = self.token != end
+            if comma:
+                self.expect(',')
+        self.advance()
+        if end == ')' and len(value) == 1 and not comma: # parentheses, not a tuple
+            return value[0]
+        return value
+
+    def call(self, func):
+        self.enter()
+        self.advance() # (
+        args, kwargs = [], {}
+        while self.token != ')':
+            if self.token is not None and self.tokens[self.index + 1] == '=':
+                name = self.token
+                if name[0] not in NAME_START:
+                    raise self.error()
+                self.advance()
+                self.advance()
+                kwargs[str(name)] = self.value()
+            else:
+                args.append(self.value())
+            if self.token != ')':
+                self.expect(',')
+        self.advance()
+        self.depth -= 1
+        try:
+            return func(*args, **kwargs)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(str(e))
+
+def parse(text, parse_float=None, max_depth=None):
+    """
+    Returns the value of text. Numbers with a fraction are passed to
+    parse_float (float by default), and arrays, objects and tuples may be
+    nested max_depth levels deep (default: 100).
+    """
+    return Parser(text, parse_float, max_depth).parse()
@@ -0,0 +1,133 @@
+"""
+Lookups and transforms for JSON fields stored as PostgreSQL jsonb, and for
+the indexed paths of JSON fields.
+
+Requires Django 1.7 or later.
+"""
+from __future__ import unicode_literals
+
+from django.core.exceptions import FieldError
+from django.db.models.lookups import Lookup, Transform
+
+class KeyTransform(Transform):
+    """
+    Selects a key of a JSON object (or an index of an array), so that
+    json__user__id=5 compares the nested value in the database.
+    """
+
+    def __init__(self, key_name, *args, **kwargs):
+        super(KeyTransform, self).__init__(*args, **kwargs)
+        self.key_name = key_name
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError('JSON key lookups are not supported on %s.' % connection.vendor)
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = compiler.compile(self.lhs)
+        try:
+            key = int(self.key_name) # array index
+        except ValueError:
+            key = self.key_name
+        return '(%s -> %%s)' % lhs, params + [key]
+
+class KeyTransformFactory(object):
+
+    def __init__(self, key_name):
+        self.key_name = key_name
+
+    def __call__(self, *args, **kwargs):
+        return KeyTransform(self.key_name, *args, **kwargs)
+
+class PathTransform(Transform):
+    """
+    Selects a path within a JSON field that has indexed_paths. Complete
+    indexed paths are read from their generated column (see
+    json_field.indexes) and compared as its output_field, other paths of
+    jsonb columns are selected like KeyTransform does.
+    """
+
+    def __init__(self, keys, *args, **kwargs):
+        super(PathTransform, self).__init__(*args, **kwargs)
+        self.keys = keys
+        self.field = self.lhs.output_field
+        self.index = self.field.get_path_index(keys)
+
+    @property
+    def output_field(self):
+        return self.index.output_field if self.index is not None else self.field
+
+    def as_sql(self, compiler, connection):
+        if self.index is None:
+            if not self.field.jsonb or connection.vendor != 'postgresql':
+                raise NotImplementedError('"%s" is not an indexed path.' % '.'.join(map(str, self.keys)))
+            lhs, params = compiler.compile(self.lhs)
+            for key in self.keys:
+                lhs = '(%s -> %%s)' % lhs
+            return lhs, params + self.keys
+        return '%s.%s' % (compiler.quote_name_unless_alias(self.lhs.alias),
+                          connection.ops.quote_name(self.index.get_column(self.field))), []
+
+class PathTransformFactory(object):
+
+    def __init__(self, key_name):
+        self.key_name = int(key_name) if key_name.isdigit() else key_name
+
+    def __call__(self, lhs, *args, **kwargs):
+        keys = [self.key_name]
+        if isinstance(lhs, PathTransform) and lhs.index is None: # json__user__id selects ['user', 'id']
+            keys = lhs.keys + keys
+            lhs = lhs.lhs
+        field = lhs.output_field
+        if not field.jsonb and not any(index.keys[:len(keys)] == keys for index in field.indexed_paths):
+            raise FieldError('"%s" is not an indexed path of %s.' % ('.'.join(map(str, keys)), field.name))
+        return PathTransform(keys, lhs, *args, **kwargs)
+
+class JSONBLookup(Lookup):
+    """ Compares the left hand side against a jsonb operand. """
+
+    operator = None
+
+    def get_prep_lookup(self):
+        return self.rhs
+
+    def process_rhs(self, compiler, connection):
+        if hasattr(self.rhs, 'as_sql'):
+            return super(JSONBLookup, self).process_rhs(compiler, connection)
+        return '%s::jsonb', [self.lhs.output_field.get_db_prep_value(self.rhs, connection=connection, force=True)]
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError('The "%s" lookup is not supported on %s.' % (self.lookup_name, connection.vendor))
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return '%s %s %s' % (lhs, self.operator, rhs), lhs_params + rhs_params
+
+class DataContains(JSONBLookup):
+    lookup_name = 'contains'
+    operator = '@>'
+
+class ContainedBy(JSONBLookup):
+    lookup_name = 'contained_by'
+    operator = '<@'
+
+class HasKey(JSONBLookup):
+    lookup_name = 'has_key'
+    operator = '?'
+
+    def process_rhs(self, compiler, connection):
+        return '%s', [self.rhs]
+
+class HasAnyKeys(JSONBLookup):
+    lookup_name = 'has_any_keys'
+    operator = '?|'
+
+    def process_rhs(self, compiler, connection):
+        return '%s::text[]', [list(self.rhs)]
+
+class HasKeys(HasAnyKeys):
+    lookup_name = 'has_keys'
+    operator = '?&'
+
+JSONB_LOOKUPS = dict((lookup.lookup_name, lookup) for lookup in
+                     (DataContains, ContainedBy, HasKey, HasAnyKeys, HasKeys))
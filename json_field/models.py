@@ -0,0 +1,56 @@
+from django.db import DatabaseError, router, transaction
+
+from json_field.fields import JSONField
+
+class DirtyJSONFieldsMixin(object):
+    """
+    Model mixin restricting save() to the JSON fields that changed, so
+    unchanged JSON columns are neither serialized nor rewritten. Requires
+    track_changes=True on fields whose values are accessed.
+
+    Only instances loaded from the database (or saved) under their current
+    primary key are saved this way; if their row was deleted meanwhile,
+    they are inserted again by a full save.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(DirtyJSONFieldsMixin, cls).from_db(db, field_names, values)
+        instance._json_field_loaded_pk = instance.pk
+        return instance
+
+    def _do_update(self, *args, **kwargs):
+        updated = super(DirtyJSONFieldsMixin, self)._do_update(*args, **kwargs)
+        if not updated:
+            self._json_field_missed = True
+        return updated
+
+    def save(self, *args, **kwargs):
+        if args or self._state.adding or self.pk is None or kwargs.get('force_insert') or \
+                kwargs.get('update_fields') is not None or \
+                self.__dict__.get('_json_field_loaded_pk') != self.pk:
+            result = super(DirtyJSONFieldsMixin, self).save(*args, **kwargs)
+        else:
+            result = self._save_dirty(**kwargs)
+        self._json_field_loaded_pk = self.pk
+        return result
+
+    def _save_dirty(self, **kwargs):
+        dirty = self.get_dirty_json_fields()
+        update_fields = [
+            field.name for field in self._meta.fields
+            if not field.primary_key and field.attname in self.__dict__ and
+            (not isinstance(field, JSONField) or field.name in dirty)
+        ]
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        self._json_field_missed = False
+        try:
+            with transaction.atomic(using=using):
+                return super(DirtyJSONFieldsMixin, self).save(update_fields=update_fields, **kwargs)
+        except DatabaseError:
+            # the row is gone: save() would insert it, which requires every field
+            if kwargs.get('force_update') or not self._json_field_missed:
+                raise
+        finally:
+            self._json_field_missed = False
+        return super(DirtyJSONFieldsMixin, self).save(**kwargs)
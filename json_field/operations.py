@@ -0,0 +1,200 @@
+"""
+Migration operations for JSON fields.
+
+Requires Django 1.7 or later.
+"""
+from __future__ import unicode_literals
+
+from django.db.migrations.operations.base import Operation
+
+from json_field import compression, formats
+from json_field.fields import BINARY_TYPES, RawJSON, read_binary
+from json_field.indexes import JSONPathIndex
+
+class CreateGinIndex(Operation):
+    """
+    Creates a GIN index on a jsonb JSONField, speeding up the contains,
+    has_key, has_keys and has_any_keys lookups. With path_ops=True the
+    smaller jsonb_path_ops index is built, which only supports contains.
+
+    Nothing is done on databases other than PostgreSQL.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, field_name, name=None, path_ops=False):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+        self.path_ops = path_ops
+
+    def deconstruct(self):
+        kwargs = {}
+        if self.name:
+            kwargs['name'] = self.name
+        if self.path_ops:
+            kwargs['path_ops'] = self.path_ops
+        return (self.__class__.__name__, [self.model_name, self.field_name], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_index_name(self, model, field):
+        return self.name or '%s_%s_gin' % (model._meta.db_table, field.column)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        field = model._meta.get_field(self.field_name)
+        quote_name = schema_editor.quote_name
+        schema_editor.execute('CREATE INDEX %s ON %s USING gin (%s%s)' % (
+            quote_name(self.get_index_name(model, field)),
+            quote_name(model._meta.db_table),
+            quote_name(field.column),
+            ' jsonb_path_ops' if self.path_ops else '',
+        ))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        field = model._meta.get_field(self.field_name)
+        schema_editor.execute('DROP INDEX %s' % schema_editor.quote_name(self.get_index_name(model, field)))
+
+    def describe(self):
+        return 'Create GIN index on %s.%s' % (self.model_name, self.field_name)
+
+class ConvertJSONFormat(Operation):
+    """
+    Rewrites the rows of a JSONField that aren't stored in format
+    ('msgpack', 'cbor', or 'json' for JSON text), e.g. text rows once
+    format='msgpack' was set by an earlier AlterField. Reversing it rewrites
+    them in old_format (default: 'json') before that AlterField is
+    reversed. Rows are read batch_size at a time; those not converted yet
+    remain readable in the meantime.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, field_name, format, old_format='json', batch_size=1000):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.format = format
+        self.old_format = old_format
+        self.batch_size = batch_size
+
+    def deconstruct(self):
+        kwargs = {}
+        if self.old_format != 'json':
+            kwargs['old_format'] = self.old_format
+        if self.batch_size != 1000:
+            kwargs['batch_size'] = self.batch_size
+        return (self.__class__.__name__, [self.model_name, self.field_name, self.format], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_format_id(self, format):
+        return None if format in (None, 'json') else formats.get_format(format).id
+
+    def needs_conversion(self, format_id, value):
+        if value is None:
+            return False
+        stored_id = None
+        if isinstance(value, BINARY_TYPES):
+            data = compression.decompress(value)
+            if formats.is_encoded(data):
+                stored_id = bytearray(data[1:2])[0]
+        return stored_id != format_id
+
+    def decode(self, field, value):
+        # rows in any format, whatever the format of field
+        if isinstance(value, BINARY_TYPES):
+            value = read_binary(value)
+        return formats.decode(value) if isinstance(value, bytes) else field.get_codec()[1](value)
+
+    def convert(self, model, using, format):
+        field = model._meta.get_field(self.field_name)
+        format_id = self.get_format_id(format)
+        encode = formats.get_encoder(format) if format_id else field.get_codec()[0]
+        queryset = model._default_manager.using(using).order_by('pk')
+        last = None
+        while True:
+            rows = queryset if last is None else queryset.filter(pk__gt=last)
+            rows = list(rows.values_list('pk', field.attname)[:self.batch_size])
+            if not rows:
+                break
+            for pk, value in rows:
+                if self.needs_conversion(format_id, value):
+                    # written as is, in the column the field has at this point
+                    text = encode(self.decode(field, value))
+                    queryset.filter(pk=pk).update(**{field.attname: RawJSON(text)})
+            last = rows[-1][0]
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self.convert(to_state.apps.get_model(app_label, self.model_name), schema_editor.connection.alias,
+                     self.format)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.convert(to_state.apps.get_model(app_label, self.model_name), schema_editor.connection.alias,
+                     self.old_format)
+
+    def describe(self):
+        return 'Convert %s.%s to %s' % (self.model_name, self.field_name, self.format)
+
+class AddJSONPathIndexes(Operation):
+    """
+    Creates the generated columns and indexes of the given paths of a
+    JSONField (see json_field.indexes), and drops those of removed_paths.
+    Paths are looked up in the indexed_paths of the field, or given as
+    JSONPathIndex instances, which removed paths need to be if they aren't
+    indexed as strings (reversing the operation recreates them). Add it
+    after the CreateModel or AlterField setting indexed_paths; on SQLite it
+    must also follow any later operation rebuilding the table.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, field_name, paths=(), removed_paths=()):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.paths = list(paths)
+        self.removed_paths = list(removed_paths)
+
+    def deconstruct(self):
+        kwargs = {}
+        if self.paths:
+            kwargs['paths'] = self.paths
+        if self.removed_paths:
+            kwargs['removed_paths'] = self.removed_paths
+        return (self.__class__.__name__, [self.model_name, self.field_name], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_indexes(self, model, field, paths):
+        indexed = dict((index.path, index) for index in getattr(field, 'indexed_paths', []))
+        return [path if isinstance(path, JSONPathIndex) else indexed.get(path) or JSONPathIndex(path)
+                for path in paths]
+
+    def sync(self, app_label, schema_editor, state, paths, removed_paths):
+        connection = schema_editor.connection
+        model = state.apps.get_model(app_label, self.model_name)
+        field = model._meta.get_field(self.field_name)
+        for index in self.get_indexes(model, field, removed_paths):
+            for sql in index.drop_sql(model, field, connection):
+                schema_editor.execute(sql)
+        for index in self.get_indexes(model, field, paths):
+            for sql in index.create_sql(model, field, connection):
+                schema_editor.execute(sql)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self.sync(app_label, schema_editor, to_state, self.paths, self.removed_paths)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.sync(app_label, schema_editor, from_state, self.removed_paths, self.paths)
+
+    def describe(self):
+        return 'Add indexed paths %s of %s.%s' % (
+            ', '.join(getattr(path, 'path', path) for path in self.paths), self.model_name, self.field_name)
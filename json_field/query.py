@@ -0,0 +1,376 @@
+from __future__ import unicode_literals
+
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+from django.db.models import Manager
+from django.db.models.query import QuerySet
+
+from json_field.fields import JSONField, Creator, RawJSON
+from json_field import compression
+from json_field.frozen import thaw
+try:
+    from json_field.expressions import JSONExtract, JSONSet, JSONPatch, JSONUpdate
+except ImportError: # django < 1.8
+    JSONExtract = JSONSet = JSONPatch = JSONUpdate = None
+
+def split_json_path(model, path):
+    """
+    Splits a lookup such as 'json__user__id' into the JSONField and the
+    keys within it, or returns (None, None) if path doesn't start with the
+    name of a JSONField. Digits are treated as array indexes.
+    """
+    parts = path.split('__')
+    try:
+        field = model._meta.get_field(parts[0])
+    except Exception: # FieldDoesNotExist moved between versions
+        return None, None
+    if not isinstance(field, JSONField):
+        return None, None
+    return field, [int(key) if key.isdigit() else key for key in parts[1:]]
+
+def get_path(value, keys):
+    """ Returns the value found at keys within value, or None. """
+    for key in keys:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return value
+
+def split_keys(path):
+    """ Returns the keys of a dotted path such as 'stats.views' or a sequence. """
+    if isinstance(path, (list, tuple)):
+        return list(path)
+    return [int(key) if key.isdigit() else key for key in path.split('.')]
+
+def set_path(value, keys, item):
+    """
+    Sets the value at keys within value to item, like the json_set()
+    database functions. Nothing is changed if the parent of the last key
+    is missing.
+    """
+    parent = get_path(value, keys[:-1])
+    key = keys[-1]
+    if isinstance(parent, dict):
+        parent[key] = item
+    elif isinstance(parent, list) and isinstance(key, int):
+        if key < len(parent):
+            parent[key] = item
+        else:
+            parent.append(item)
+    return value
+
+def merge_patch(value, patch):
+    """ Returns value merged with patch following RFC 7396. """
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(value, dict):
+        value = {}
+    for key, item in patch.items():
+        if item is None:
+            value.pop(key, None)
+        else:
+            value[key] = merge_patch(value.get(key), item)
+    return value
+
+def encode_values(field, values):
+    """
+    Serializes (and compresses) values as field would store them. Runs in
+    the workers of bulk_create_json() and bulk_update_json().
+    """
+    encode = field.get_encoder()
+    texts = []
+    for value in values:
+        text = encode(value)
+        if field.binary:
+            if not isinstance(text, bytes):
+                text = text.encode('utf-8')
+            if field.compress:
+                text = compression.compress(text, field.compress, field.compress_threshold)
+        texts.append(text)
+    return texts
+
+def _result(chunk):
+    return chunk.result() if hasattr(chunk, 'result') else chunk
+
+class JSONQuerySet(QuerySet):
+
+    def json_values(self, *paths):
+        """
+        Returns an iterator of dictionaries, like values(), holding the
+        values found at JSON paths such as 'json__user__id'. Other field
+        names are returned as is.
+
+        On SQLite, PostgreSQL and MySQL only the requested parts of the
+        documents are selected, otherwise (or if they are compressed or in
+        a binary format) the documents are deserialized one row at a time.
+        """
+        binary = any(field.binary for field, keys in self._json_paths(paths).values())
+        if JSONExtract is not None and JSONExtract.supports(connections[self.db]) and not binary:
+            return self._json_values_extract(paths)
+        return self._json_values_python(paths)
+
+    def _json_paths(self, paths):
+        json_paths = {}
+        for path in paths:
+            field, keys = split_json_path(self.model, path)
+            if field is not None:
+                json_paths[path] = (field, keys)
+        return json_paths
+
+    def _json_values_extract(self, paths):
+        json_paths = self._json_paths(paths)
+        aliases, annotations = {}, {}
+        for i, path in enumerate(paths):
+            if path in json_paths:
+                field, keys = json_paths[path]
+                aliases[path] = '_json_value_%d' % i
+                annotations[aliases[path]] = JSONExtract(field.attname, keys)
+        names = [aliases.get(path, path) for path in paths]
+        # the schema of a field applies from the extracted path
+        decoders = dict((path, field.get_path_decoder(keys)) for path, (field, keys) in json_paths.items())
+        for row in self.annotate(**annotations).values(*names).iterator():
+            result = {}
+            for path, name in zip(paths, names):
+                value = row[name]
+                if path in json_paths:
+                    value = decoders[path](value)
+                result[path] = value
+            yield result
+
+    def _json_values_python(self, paths):
+        json_paths = self._json_paths(paths)
+        names = []
+        for path in paths:
+            name = json_paths[path][0].attname if path in json_paths else path
+            if name not in names:
+                names.append(name)
+        for row in self.values(*names).iterator():
+            documents = {}
+            result = {}
+            for path in paths:
+                if path in json_paths:
+                    field, keys = json_paths[path]
+                    if field.attname not in documents:
+                        documents[field.attname] = field.to_python(row[field.attname])
+                    result[path] = get_path(documents[field.attname], keys)
+                else:
+                    result[path] = row[path]
+            yield result
+
+    def decode_json(self, *field_names, **kwargs):
+        """
+        Iterates over the queryset like iterator(), deserializing the JSON
+        fields named (all of them by default) batch_size rows at a time
+        with a single decoder per field.
+
+        An optional concurrent.futures executor deserializes the values of
+        each batch in parallel; use a process pool to make use of several
+        cores for very large documents.
+        """
+        batch_size = kwargs.pop('batch_size', 100)
+        executor = kwargs.pop('executor', None)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments: %s' % ', '.join(kwargs))
+        creators = []
+        for field in self.model._meta.fields:
+            if isinstance(field, JSONField) and (not field_names or field.name in field_names):
+                creator = getattr(self.model, field.attname, None)
+                if isinstance(creator, Creator) and creator.lazy:
+                    creators.append(creator)
+        batch = []
+        for obj in self.iterator():
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                self._decode_batch(batch, creators, executor)
+                for obj in batch:
+                    yield obj
+                batch = []
+        self._decode_batch(batch, creators, executor)
+        for obj in batch:
+            yield obj
+
+    def _decode_batch(self, batch, creators, executor):
+        for creator in creators:
+            # deferred fields aren't loaded
+            objs = [obj for obj in batch
+                    if creator.field.attname in obj.__dict__ and not creator.is_deserialized(obj)]
+            values = [obj.__dict__[creator.field.attname] for obj in objs]
+            if executor is not None:
+                values = executor.map(creator.field.to_python, values)
+            else:
+                values = creator.field.decode_many(values)
+            for obj, value in zip(objs, values):
+                creator.set_deserialized(obj, value)
+
+    def adecode_json(self, *field_names):
+        """
+        Returns an awaitable list of the instances of the queryset with
+        their JSON fields deserialized concurrently (see json_field.aio).
+        """
+        from json_field import aio
+        return aio.adecode_queryset(self, *field_names)
+
+    def _json_creators(self, field_names=None):
+        creators = []
+        for field in self.model._meta.fields:
+            if isinstance(field, JSONField) and (field_names is None or field.name in field_names):
+                creator = getattr(self.model, field.attname, None)
+                if isinstance(creator, Creator):
+                    creators.append(creator)
+        return creators
+
+    def _encode_json(self, objs, creators, executor, chunk_size):
+        """
+        Starts serializing the JSON fields of objs, in executor if given,
+        returning (creator, objs, chunks) tuples for _raw_json().
+        """
+        pending = []
+        for creator in creators:
+            field = creator.field
+            values, field_objs = [], []
+            for obj in objs:
+                value = getattr(obj, field.attname)
+                if isinstance(value, RawJSON) or (field.null and value is None):
+                    continue
+                values.append(value)
+                field_objs.append(obj)
+            chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+            if executor is not None:
+                chunks = [executor.submit(encode_values, field, chunk) for chunk in chunks]
+            else:
+                chunks = [encode_values(field, chunk) for chunk in chunks]
+            pending.append((creator, field_objs, chunks))
+        return pending
+
+    @contextmanager
+    def _raw_json(self, pending):
+        """
+        Replaces the values of the JSON fields with their serialized text
+        while the block runs.
+        """
+        replaced = []
+        saved = False
+        try:
+            for creator, objs, chunks in pending:
+                name = creator.field.attname
+                texts = [text for chunk in chunks for text in _result(chunk)]
+                for obj, text in zip(objs, texts):
+                    replaced.append((creator, obj, obj.__dict__[name], text))
+                    obj.__dict__[name] = RawJSON(text)
+                    if creator.lazy:
+                        creator._get_dict(obj, creator._state_key)[name] = True
+            yield
+            saved = True
+        finally:
+            for creator, obj, value, text in replaced:
+                obj.__dict__[creator.field.attname] = value
+                if saved: # otherwise the text isn't stored
+                    creator.set_stored_json(obj, text, value)
+
+    def _bulk_json(self, objs, field_names, batch_size, executor, chunk_size, save):
+        creators = self._json_creators(field_names)
+        batches = [objs[i:i + batch_size] for i in range(0, len(objs), batch_size)]
+        pending = self._encode_json(batches[0], creators, executor, chunk_size) if batches else None
+        for i, batch in enumerate(batches):
+            current = pending
+            if i + 1 < len(batches): # serialize the next batch while this one is written
+                pending = self._encode_json(batches[i + 1], creators, executor, chunk_size)
+            with self._raw_json(current):
+                save(batch)
+
+    def bulk_create_json(self, objs, batch_size=1000, executor=None, chunk_size=100):
+        """
+        Like bulk_create(), but serializes the JSON fields of the next batch
+        of batch_size objects, chunk_size values at a time in the optional
+        concurrent.futures executor, while the current batch is inserted.
+        """
+        objs = list(objs)
+        created = []
+        self._bulk_json(objs, None, batch_size, executor, chunk_size,
+                        lambda batch: created.extend(self.bulk_create(batch)))
+        return created
+
+    def bulk_update_json(self, objs, fields, batch_size=1000, executor=None, chunk_size=100):
+        """
+        Updates fields of objs like bulk_update(), serializing their JSON
+        fields as bulk_create_json() does. Without bulk_update() (Django <
+        2.2) each object is saved in turn within a transaction.
+        """
+        objs = list(objs)
+        if hasattr(QuerySet, 'bulk_update'):
+            save = lambda batch: QuerySet.bulk_update(self, batch, fields)
+        else:
+            def save(batch):
+                with transaction.atomic(using=self.db):
+                    for obj in batch:
+                        obj.save(update_fields=fields, using=self.db)
+        self._bulk_json(objs, fields, batch_size, executor, chunk_size, save)
+
+    def json_set(self, field_name, path, value):
+        """
+        Sets the value at path, e.g. 'stats.views' or ['tags', 0], within
+        the named JSONField of every row to value, a JSON value or an
+        expression, in a single UPDATE. Returns the number of rows matched.
+        """
+        field = self.model._meta.get_field(field_name)
+        keys = split_keys(path)
+        if self._json_update_supported(field):
+            return self.update(**{field.attname: JSONSet(field.attname, keys, value, output_field=field)})
+        if hasattr(value, 'resolve_expression'):
+            raise NotImplementedError('Expressions can not be set on %s.' % connections[self.db].vendor)
+        return self._json_update_python(field, lambda document: set_path(document, keys, value))
+
+    def json_patch(self, field_name, patch):
+        """
+        Merges patch into the named JSONField of every row following RFC
+        7396 (keys set to None are removed) in a single UPDATE. Returns the
+        number of rows matched.
+        """
+        field = self.model._meta.get_field(field_name)
+        if self._json_update_supported(field):
+            return self.update(**{field.attname: JSONPatch(field.attname, patch, output_field=field)})
+        return self._json_update_python(field, lambda document: merge_patch(document, patch))
+
+    def _json_update_supported(self, field):
+        return JSONUpdate is not None and JSONUpdate.supports(connections[self.db], field)
+
+    def _json_update_python(self, field, update):
+        # other databases and binary columns: the documents are updated
+        # one row at a time
+        count = 0
+        with transaction.atomic(using=self.db):
+            for obj in self.select_for_update().only('pk', field.attname).iterator():
+                setattr(obj, field.attname, update(thaw(getattr(obj, field.attname))))
+                obj.save(update_fields=[field.attname], using=self.db)
+                count += 1
+        return count
+
+class JSONManager(Manager):
+    """ Manager providing the JSONQuerySet methods. """
+
+    def get_queryset(self):
+        return JSONQuerySet(self.model, using=self._db)
+    get_query_set = get_queryset # django < 1.6
+
+    def json_values(self, *paths):
+        return self.get_queryset().json_values(*paths)
+
+    def decode_json(self, *field_names, **kwargs):
+        return self.get_queryset().decode_json(*field_names, **kwargs)
+
+    def adecode_json(self, *field_names):
+        return self.get_queryset().adecode_json(*field_names)
+
+    def bulk_create_json(self, objs, **kwargs):
+        return self.get_queryset().bulk_create_json(objs, **kwargs)
+
+    def bulk_update_json(self, objs, fields, **kwargs):
+        return self.get_queryset().bulk_update_json(objs, fields, **kwargs)
+
+    def json_set(self, field_name, path, value):
+        return self.get_queryset().json_set(field_name, path, value)
+
+    def json_patch(self, field_name, patch):
+        return self.get_queryset().json_patch(field_name, patch)
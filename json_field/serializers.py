@@ -0,0 +1,179 @@
+"""
+Django serializer embedding JSON fields as native JSON.
+
+The "json" serializer writes the value of a JSONField as an escaped string,
+which costs a full decode and encode per row and bloats fixtures. This one
+embeds the stored text verbatim (unless the value was changed), and loads
+fixtures without deserializing the fields: their text is saved as is, with
+numbers written as they appear in the fixture. Enable it for dumpdata and
+loaddata with:
+
+    SERIALIZATION_MODULES = {'json': 'json_field.serializers'}
+
+Fixtures written by the "json" serializer load unchanged. Streams are read
+one object at a time when ijson is installed.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import decimal
+import json
+import re
+import sys
+import uuid
+
+import six
+from django.core.serializers import base
+from django.core.serializers.json import Serializer as JSONSerializer, DjangoJSONEncoder
+from django.core.serializers.python import Deserializer as PythonDeserializer
+
+from json_field.fields import JSONField, Creator, RawJSON
+
+class Serializer(JSONSerializer):
+    """ Serializes a queryset to JSON, embedding JSON fields natively. """
+
+    def start_serialization(self):
+        super(Serializer, self).start_serialization()
+        self._marker = '__json_field_%s_' % uuid.uuid4().hex
+        self._texts = []
+
+    def handle_field(self, obj, field):
+        if not isinstance(field, JSONField):
+            return super(Serializer, self).handle_field(obj, field)
+        text = field.get_json_text(obj)
+        if text is None or text.lstrip().startswith('"'):
+            # strings are kept as JSON text, as the "json" serializer does,
+            # so they can't be mistaken for it when loaded
+            self._current[field.name] = text
+        else:
+            self._current[field.name] = '%s%d' % (self._marker, len(self._texts))
+            self._texts.append(text)
+
+    def end_object(self, obj):
+        indent = self.options.get('indent')
+        if not self.first:
+            self.stream.write(',')
+            if not indent:
+                self.stream.write(' ')
+        if indent:
+            self.stream.write('\n')
+        data = json.dumps(self.get_dump_object(obj), cls=DjangoJSONEncoder, **self.json_kwargs)
+        for i, text in enumerate(self._texts):
+            data = data.replace('"%s%d"' % (self._marker, i), text, 1)
+        self.stream.write(data)
+        self._texts = []
+        self._current = None
+
+class DeserializedObject(base.DeserializedObject):
+    """
+    Saves the JSON text of the fixture for fields that weren't accessed, and
+    for eager fields, whose values were decoded from it.
+    """
+
+    def __init__(self, obj, m2m_data=None, json_texts=None):
+        super(DeserializedObject, self).__init__(obj, m2m_data)
+        self.json_texts = json_texts or {}
+
+    def save(self, *args, **kwargs):
+        obj = self.object
+        replaced = []
+        for name, text in self.json_texts.items():
+            creator = getattr(obj.__class__, name)
+            if not creator.lazy or not creator.is_deserialized(obj):
+                replaced.append((creator, obj.__dict__[name], text))
+                obj.__dict__[name] = RawJSON(text)
+                creator._get_dict(obj, creator._state_key)[name] = True
+        try:
+            super(DeserializedObject, self).save(*args, **kwargs)
+        finally:
+            for creator, value, text in replaced:
+                obj.__dict__[creator.field.attname] = value
+                creator._get_dict(obj, creator._state_key)[creator.field.attname] = False
+                creator.set_stored_json(obj, text, value)
+
+class Number(decimal.Decimal):
+    """ A number with a fraction, which remembers its text. """
+
+    def __new__(cls, text):
+        number = super(Number, cls).__new__(cls, text)
+        number.text = text
+        return number
+
+def _iter_objects(stream_or_string):
+    # numbers with a fraction are parsed as decimals rather than floats, so
+    # JSON fields get them back with all their digits
+    if not isinstance(stream_or_string, (bytes, six.string_types)):
+        try:
+            import ijson
+        except ImportError:
+            stream_or_string = stream_or_string.read()
+        else:
+            return ijson.items(stream_or_string, 'item', use_float=False)
+    if isinstance(stream_or_string, bytes):
+        stream_or_string = stream_or_string.decode('utf-8')
+    return json.loads(stream_or_string, parse_float=Number)
+
+def _replace_numbers(value, marker, numbers):
+    """
+    Replaces the decimals within value, in place, by placeholders of their
+    text appended to numbers.
+    """
+    items = value.items() if isinstance(value, dict) else enumerate(value)
+    for key, item in items:
+        if isinstance(item, (dict, list)):
+            _replace_numbers(item, marker, numbers)
+        elif isinstance(item, decimal.Decimal):
+            value[key] = '%s%d' % (marker, len(numbers))
+            numbers.append(getattr(item, 'text', None) or six.text_type(item))
+
+def _encode(field, value, marker):
+    """ Returns the JSON text of value, writing its decimals as bare numbers. """
+    numbers = []
+    if isinstance(value, decimal.Decimal):
+        return getattr(value, 'text', None) or six.text_type(value)
+    if isinstance(value, (dict, list)):
+        _replace_numbers(value, marker, numbers)
+    text = field.get_encoder()(value)
+    if numbers:
+        text = re.sub('"%s(\\d+)"' % marker, lambda match: numbers[int(match.group(1))], text)
+    return text
+
+def _json_fields(model_identifier, cache):
+    if model_identifier not in cache:
+        try:
+            from django.apps import apps
+            model = apps.get_model(model_identifier)
+        except (LookupError, TypeError, ValueError):
+            fields = []
+        else:
+            fields = [(field.name, field) for field in model._meta.fields
+                      if isinstance(field, JSONField) and isinstance(getattr(model, field.attname, None), Creator)]
+        cache[model_identifier] = fields
+    return cache[model_identifier]
+
+def Deserializer(stream_or_string, **options):
+    """
+    Deserializes a stream or string of JSON data. The values of JSON fields
+    are assigned as JSON text, so they are only decoded when accessed.
+    """
+    fields = {}
+    marker = '__json_field_%s_' % uuid.uuid4().hex
+    try:
+        for d in _iter_objects(stream_or_string):
+            texts = {}
+            for name, field in _json_fields(d.get('model'), fields):
+                if name not in d.get('fields', {}):
+                    continue
+                value = d['fields'].pop(name)
+                if value is not None and not isinstance(value, six.string_types):
+                    value = _encode(field, value, marker)
+                texts[field.attname] = value
+            for deserialized in PythonDeserializer([d], **options):
+                obj = deserialized.object
+                for name, text in texts.items():
+                    setattr(obj, name, text)
+                texts = dict((name, text) for name, text in texts.items() if text is not None)
+                yield DeserializedObject(obj, deserialized.m2m_data, texts)
+    except GeneratorExit:
+        raise
+    except Exception as e:
+        six.reraise(base.DeserializationError, base.DeserializationError(e), sys.exc_info()[2])
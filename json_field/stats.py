@@ -0,0 +1,95 @@
+"""
+Instrumentation of JSON fields.
+
+The JSON_FIELD_STATS setting names a callable (or its dotted path) that is
+called as callback(event, field, **info) for each of these events:
+
+    'encode'  a value was serialized: duration (seconds) and size (bytes
+              of the JSON text, as stored)
+    'decode'  a value was deserialized: duration, size and conversions
+              (number of dates, times and datetimes created)
+    'access'  the attribute of a field was read: lazy, and decoded which is
+              True when the read deserialized the value
+
+Nothing is measured when the setting is unset.
+"""
+from __future__ import unicode_literals
+
+import threading
+import time
+from importlib import import_module
+
+import six
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+try:
+    from django.core.signals import setting_changed
+except ImportError: # django < 1.8
+    from django.test.signals import setting_changed
+
+try:
+    timer = time.perf_counter
+except AttributeError: # python 2
+    timer = time.time
+
+_UNSET = object()
+_callback = _UNSET
+
+def get_callback():
+    """ Returns the JSON_FIELD_STATS callable, or None. """
+    global _callback
+    if _callback is _UNSET:
+        callback = getattr(settings, 'JSON_FIELD_STATS', None)
+        if isinstance(callback, six.string_types):
+            module_name, _, name = callback.rpartition('.')
+            try:
+                callback = getattr(import_module(module_name), name)
+            except (ImportError, AttributeError, ValueError):
+                raise ImproperlyConfigured('JSON_FIELD_STATS "%s" could not be imported.' % callback)
+        _callback = callback
+    return _callback
+
+def reset_callback(**kwargs):
+    global _callback
+    if kwargs.get('setting') in (None, 'JSON_FIELD_STATS'):
+        _callback = _UNSET
+setting_changed.connect(reset_callback)
+
+# set once a decoder is instrumented, so conversions are only counted then
+counting = False
+_local = threading.local()
+
+def count_conversion():
+    """ Called for each date, time or datetime created by a decoder. """
+    conversions = getattr(_local, 'conversions', None)
+    if conversions is not None:
+        _local.conversions = conversions + 1
+
+def get_size(text):
+    """ Returns the size in bytes of JSON text. """
+    return len(text.encode('utf-8')) if isinstance(text, six.text_type) else len(text)
+
+def instrument_encoder(callback, field, encode):
+    def encoder(value):
+        start = timer()
+        text = encode(value)
+        callback('encode', field, duration=timer() - start, size=get_size(text))
+        return text
+    return encoder
+
+def instrument_decoder(callback, field, decode):
+    global counting
+    counting = True
+    def decoder(text):
+        outer = getattr(_local, 'conversions', None)
+        _local.conversions = 0
+        try:
+            start = timer()
+            value = decode(text)
+            duration = timer() - start
+            conversions = _local.conversions
+        finally:
+            _local.conversions = outer
+        callback('decode', field, duration=duration, size=get_size(text), conversions=conversions)
+        return value
+    return decoder
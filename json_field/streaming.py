@@ -0,0 +1,46 @@
+"""
+Incremental decoding of large JSON values.
+
+Requires the ijson library.
+"""
+from __future__ import unicode_literals
+
+import six
+from django.core.exceptions import ImproperlyConfigured
+
+def iter_path(value, path):
+    """
+    Yields the items found at an ijson style path, such as 'items.item',
+    within an already deserialized value.
+    """
+    keys = path.split('.') if path else []
+    def walk(value, keys):
+        if not keys:
+            yield value
+        elif keys[0] == 'item':
+            if isinstance(value, list):
+                for item in value:
+                    for result in walk(item, keys[1:]):
+                        yield result
+        elif isinstance(value, dict) and keys[0] in value:
+            for result in walk(value[keys[0]], keys[1:]):
+                yield result
+    return walk(value, keys)
+
+def iter_items(text, path, use_float=False, post_process=None):
+    """
+    Yields the items found at path within JSON text (or bytes) without
+    building the whole document. Numbers with a fraction are returned as
+    Decimal unless use_float is set, and each item is passed through
+    post_process if given.
+    """
+    try:
+        import ijson
+    except ImportError:
+        raise ImproperlyConfigured('The "ijson" library is required to stream JSON values and was not found.')
+    if isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+    for item in ijson.items(text, path, use_float=use_float):
+        if post_process is not None:
+            item = post_process(item)
+        yield item
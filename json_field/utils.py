@@ -1,3 +1,5 @@
+import json
+
 def is_aware(value): # taken from django/utils/timezone.py
     """
     Determines if a given datetime.datetime is aware.
@@ -6,3 +8,26 @@ def is_aware(value): # taken from django/utils/timezone.py
     http://docs.python.org/library/datetime.html#datetime.tzinfo
     """
     return value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None
+
+def json_path(keys, connection=None):
+    """
+    Returns the SQLite and MySQL path of keys, e.g. '$."items"[0]'. Keys
+    are escaped as JSON strings, except that SQLite ends quoted keys at the
+    first quote: from 3.45 it reads \\u0022 instead, before it compares
+    keys with the stored text and those with quotes are left unquoted.
+    """
+    path = '$'
+    for key in keys:
+        if isinstance(key, int):
+            path += '[%d]' % key
+            continue
+        key = json.dumps(key)[1:-1] # as stored by JSONEncoder
+        if connection is None or connection.vendor != 'sqlite' or '"' not in key:
+            path += '."%s"' % key
+        elif connection.Database.sqlite_version_info >= (3, 45, 0):
+            path += '."%s"' % key.replace('\\"', '\\u0022')
+        elif '.' in key or '[' in key:
+            raise ValueError('SQLite < 3.45 can\'t address the key %s, it has quotes and dots or brackets.' % key)
+        else:
+            path += '.' + key
+    return path
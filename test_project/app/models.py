@@ -1,9 +1,57 @@
 from json_field import JSONField
+from json_field.models import DirtyJSONFieldsMixin
+from json_field.query import JSONManager
+from json_field.indexes import JSONPathIndex
 
 from django.db import models
 
+import datetime
+from decimal import Decimal
+
 class Test(models.Model):
 
     json = JSONField()
     json_eager = JSONField(lazy=False)
     json_null = JSONField(blank=True, null=True, evaluate_formfield=True)
+
+    objects = JSONManager()
+
+class Tracked(DirtyJSONFieldsMixin, models.Model):
+
+    name = models.CharField(max_length=100, blank=True)
+    json = JSONField(track_changes=True)
+    json_eager = JSONField(lazy=False, track_changes=True)
+
+class JSONBTest(models.Model):
+
+    json = JSONField(db_type='jsonb')
+
+class Compressed(models.Model):
+
+    json = JSONField(compress='zlib', compress_threshold=32)
+    json_eager = JSONField(compress='zlib', lazy=False, null=True)
+
+    objects = JSONManager()
+
+class Typed(models.Model):
+
+    json = JSONField(schema={'created': datetime.datetime, 'items.*.day': 'date', 'items.*.price': Decimal})
+
+class Cached(models.Model):
+
+    json = JSONField(null=True, decode_cache_size=2)
+
+class Frozen(models.Model):
+
+    json = JSONField(frozen=True, decode_cache_size=10)
+
+class Packed(models.Model):
+
+    json = JSONField(format='msgpack')
+    json_cbor = JSONField(format='cbor', compress='zlib', compress_threshold=32, null=True)
+
+    objects = JSONManager()
+
+class Indexed(models.Model):
+
+    json = JSONField(indexed_paths=[JSONPathIndex('user.id', output_field=models.IntegerField()), 'status'])